@@ -4,25 +4,44 @@ from agents.rules_agent import RulesAgent
 from settings import ROWS, COLS
 
 class AIAgent(BaseAgent):
-    def __init__(self, model=None):
+    def __init__(self, model=None, verbose=True):
         super().__init__()
         self.model = model
         self.rules_agent = RulesAgent()
+        self.verbose = verbose  # Mensajes por jugada (desactivar al evaluar)
         
     def predict_action(self, state, flags_remaining=None):
         # Primero intentar con reglas lógicas (más confiables)
         rule_action = self.rules_agent.predict_action(state, flags_remaining)
         if rule_action:
-            print(f"🔧 Regla sugiere: {rule_action}")
+            if self.verbose:
+                print(f"🔧 Regla sugiere: {rule_action}")
             return rule_action
         
         # Si las reglas no encuentran nada, usar la red neuronal
         if self.model and self.model.model:
             return self._neural_prediction(state, flags_remaining)
         
-        print("❓ No hay acción disponible")
+        if self.verbose:
+            print("❓ No hay acción disponible")
         return None
     
+    def predict_actions(self, state, flags_remaining=None, chord=False, changed=None):
+        """Todas las jugadas seguras de las reglas de una vez; si no hay, la de la red neuronal"""
+        rule_actions = self.rules_agent.predict_actions(state, flags_remaining, chord, changed)
+        if rule_actions:
+            if self.verbose:
+                print(f"🔧 Reglas sugieren {len(rule_actions)} jugada(s)")
+            return rule_actions
+        
+        if self.model and self.model.model:
+            action = self._neural_prediction(state, flags_remaining)
+            return [action] if action else []
+        
+        if self.verbose:
+            print("❓ No hay acción disponible")
+        return []
+    
     def _neural_prediction(self, state, flags_remaining):
         """Predicción usando la red neuronal"""
         try:
@@ -48,11 +67,13 @@ class AIAgent(BaseAgent):
             
             if max_left > max_right and max_left > threshold:
                 row, col = np.unravel_index(np.argmax(left_probs), left_probs.shape)
-                print(f"🧠 IA sugiere LEFT en ({row},{col}) prob:{max_left:.3f}")
+                if self.verbose:
+                    print(f"🧠 IA sugiere LEFT en ({row},{col}) prob:{max_left:.3f}")
                 return ('left', row, col)
             elif max_right > threshold:
                 row, col = np.unravel_index(np.argmax(right_probs), right_probs.shape)
-                print(f"🧠 IA sugiere RIGHT en ({row},{col}) prob:{max_right:.3f}")
+                if self.verbose:
+                    print(f"🧠 IA sugiere RIGHT en ({row},{col}) prob:{max_right:.3f}")
                 return ('right', row, col)
             
         except Exception as e:
@@ -2,4 +2,9 @@ import numpy as np
 
 class BaseAgent:
     def predict_action(self, state):
-        raise NotImplementedError
\ No newline at end of file
+        raise NotImplementedError
+
+    def predict_actions(self, state, flags_remaining=None, chord=False, changed=None):
+        """Jugadas para aplicar seguidas sobre este estado; por defecto, solo una"""
+        action = self.predict_action(state, flags_remaining)
+        return [action] if action else []
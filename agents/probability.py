@@ -0,0 +1,296 @@
+#probability.py
+# Probabilidad exacta de mina de cada casilla oculta. La frontera se parte
+# en componentes independientes (restricciones que no comparten casillas);
+# cada una se enumera con vuelta atrás y poda, y las componentes se combinan
+# con el número total de minas que quedan: las casillas interiores (ocultas
+# sin ningún número al lado) reparten el resto con peso binomial.
+# Las componentes resueltas se guardan por su forma canónica: entre jugadas
+# casi todas se repiten y solo se enumeran las que cambiaron.
+from functools import lru_cache
+from math import lgamma
+import numpy as np
+from utils.state_encoder import CODE_HIDDEN
+from agents.solver import frontier_constraints, solve_constraints, reduce_constraints
+
+# Bits por palabra al desempaquetar las soluciones guardadas como máscaras
+_MASK_BITS = 62
+
+# Componentes resueltas que se guardan (las menos usadas salen primero)
+COMPONENT_CACHE_SIZE = 4096
+
+# Límites de la enumeración exacta: por encima se usa la densidad local
+MAX_COMPONENT_CELLS = 48
+MAX_COMPONENT_BRANCHES = 200000
+
+def split_components(constraints):
+    """
+    Agrupa las restricciones que comparten casillas (unión-búsqueda).
+
+    Returns:
+        Lista de dicts {frozenset(casillas): minas}, uno por componente
+    """
+    parent = {}
+
+    def find(cell):
+        while parent[cell] != cell:
+            parent[cell] = parent[parent[cell]]
+            cell = parent[cell]
+        return cell
+
+    for cells in constraints:
+        first = next(iter(cells))
+        parent.setdefault(first, first)
+        root = find(first)
+        for cell in cells:
+            parent.setdefault(cell, cell)
+            other = find(cell)
+            if other != root:
+                parent[other] = root
+
+    components = {}
+    for cells, count in constraints.items():
+        components.setdefault(find(next(iter(cells))), {})[cells] = count
+    return list(components.values())
+
+def solve_component(constraints, max_mines=None):
+    """
+    Enumera las asignaciones válidas de una componente con vuelta atrás.
+
+    Las casillas se recorren en anchura por las restricciones para que cada
+    restricción se cierre pronto; una rama se poda en cuanto alguna
+    restricción no puede cumplirse con las casillas que le quedan.
+
+    El coste crece exponencialmente con el tamaño: las componentes de más de
+    MAX_COMPONENT_CELLS casillas no se enumeran y la búsqueda se abandona al
+    pasar de MAX_COMPONENT_BRANCHES ramas (en tableros con muchas casillas
+    reveladas sueltas salen componentes de cientos de casillas).
+
+    Returns:
+        None si la componente supera alguno de los límites; si no,
+        cells: lista de índices planos
+        counts: (M+1,) soluciones con m minas
+        cell_counts: (M+1, len(cells)) soluciones con m minas en las que la
+        casilla es mina
+    """
+    # Orden en anchura: casillas de restricciones vecinas, seguidas
+    by_cell = {}
+    for cells in constraints:
+        for cell in cells:
+            by_cell.setdefault(cell, []).append(cells)
+    if len(by_cell) > MAX_COMPONENT_CELLS:
+        return None
+    start = min(by_cell)
+    order, seen = [start], {start}
+    for cell in order:
+        for cells in by_cell[cell]:
+            for other in sorted(cells - seen):
+                seen.add(other)
+                order.append(other)
+
+    position = {cell: i for i, cell in enumerate(order)}
+    keys = list(constraints)
+    need = [constraints[cells] for cells in keys]      # Minas que faltan por poner
+    left = [len(cells) for cells in keys]              # Casillas sin asignar
+    touching = [[] for _ in order]
+    for c, cells in enumerate(keys):
+        for cell in cells:
+            touching[position[cell]].append(c)
+
+    size = len(order)
+    limit = size if max_mines is None else min(size, max_mines)
+    solutions = [[] for _ in range(limit + 1)]         # Máscaras por número de minas
+    branches = [MAX_COMPONENT_BRANCHES]
+
+    def assign(i, mask, mines):
+        branches[0] -= 1
+        if branches[0] < 0:
+            return
+        if i == size:
+            solutions[mines].append(mask)
+            return
+        for value in (0, 1):
+            if value and mines == limit:
+                break
+            ok = True
+            for c in touching[i]:
+                need[c] -= value
+                left[c] -= 1
+                if need[c] < 0 or need[c] > left[c]:
+                    ok = False
+            if ok:
+                assign(i + 1, mask | (value << i), mines + value)
+            for c in touching[i]:
+                need[c] += value
+                left[c] += 1
+
+    assign(0, 0, 0)
+    if branches[0] < 0:
+        return None
+
+    counts = np.array([len(masks) for masks in solutions], dtype=np.float64)
+    cell_counts = np.zeros((limit + 1, size), dtype=np.float64)
+    for mines, masks in enumerate(solutions):
+        if masks:
+            cell_counts[mines] = _count_bits(masks, size)
+    return order, counts, cell_counts
+
+def _count_bits(masks, size):
+    """Cuántas máscaras tienen activo cada uno de los `size` primeros bits"""
+    totals = np.zeros(size, dtype=np.float64)
+    shifts = np.arange(_MASK_BITS, dtype=np.uint64)
+    for offset in range(0, size, _MASK_BITS):
+        words = np.array([(mask >> offset) & ((1 << _MASK_BITS) - 1) for mask in masks], dtype=np.uint64)
+        bits = (words[:, None] >> shifts) & np.uint64(1)
+        width = min(_MASK_BITS, size - offset)
+        totals[offset:offset + width] = bits.sum(axis=0)[:width]
+    return totals
+
+def component_key(constraints):
+    """
+    Codificación canónica de una componente: sus casillas ordenadas pasan a
+    llamarse 0..n-1, así que el mismo patrón en otra parte del tablero (o en
+    otra partida) da la misma clave.
+
+    Returns:
+        (cells, key): casillas ordenadas y tupla hashable de (casillas locales, minas)
+    """
+    cells = sorted(set().union(*constraints))
+    local = {cell: i for i, cell in enumerate(cells)}
+    key = tuple(sorted((tuple(sorted(local[cell] for cell in group)), count)
+                       for group, count in constraints.items()))
+    return cells, key
+
+@lru_cache(maxsize=COMPONENT_CACHE_SIZE)
+def _solve_canonical(key, max_mines):
+    """Resuelve una componente canónica con un límite de minas (arrays compartidos: no modificar)"""
+    solved = solve_component({frozenset(group): count for group, count in key}, max_mines)
+    if solved is None:
+        return None  # También se guarda: no se vuelve a intentar
+    order, counts, cell_counts = solved
+    by_cell = np.empty_like(cell_counts)
+    by_cell[:, order] = cell_counts  # Columna i = casilla local i
+    counts.flags.writeable = False
+    by_cell.flags.writeable = False
+    return counts, by_cell
+
+def solve_cached(constraints, max_mines=None):
+    """
+    Como solve_component, pero reutiliza la solución de cualquier componente
+    con la misma clave canónica; solo se enumeran las componentes nuevas.
+
+    El límite de minas forma parte de la clave (recortado al número de
+    casillas, que no limita nada): así se conserva la poda de solve_component
+    y una componente sin límite efectivo se comparte entre jugadas.
+    """
+    cells, key = component_key(constraints)
+    limit = len(cells) if max_mines is None else min(max_mines, len(cells))
+    solved = _solve_canonical(key, limit)
+    if solved is None:
+        return None
+    return (cells,) + solved
+
+def component_cache_info():
+    """Aciertos, fallos y tamaño de la caché de componentes"""
+    return _solve_canonical.cache_info()
+
+def clear_component_cache():
+    _solve_canonical.cache_clear()
+
+def local_density(constraints):
+    """
+    Probabilidad aproximada para componentes demasiado grandes: la media, entre
+    las restricciones de cada casilla, de minas por casilla.
+
+    Returns:
+        dict {índice plano: probabilidad}
+    """
+    densities = {}
+    for cells, count in constraints.items():
+        for cell in cells:
+            densities.setdefault(cell, []).append(count / len(cells))
+    return {cell: sum(values) / len(values) for cell, values in densities.items()}
+
+def _log_comb(n, k):
+    return lgamma(n + 1) - lgamma(k + 1) - lgamma(n - k + 1)
+
+def mine_probabilities(codes, mines_left):
+    """
+    Probabilidad exacta de mina de cada casilla oculta sin bandera.
+
+    Las componentes que superan los límites de solve_component se aproximan
+    con local_density y sus minas esperadas se descuentan de las que quedan.
+
+    Args:
+        codes: rejilla de códigos (ROWS, COLS)
+        mines_left: minas sin bandera (las del tablero menos las banderas puestas)
+
+    Returns:
+        array (ROWS, COLS) float64 con NaN en las casillas reveladas o con bandera
+    """
+    codes = np.asarray(codes)
+    flat = codes.ravel()
+    hidden = flat == CODE_HIDDEN
+
+    probabilities = np.full(flat.shape, np.nan)
+    probabilities[hidden] = 0.0
+
+    # Lo seguro se resuelve sin enumerar y no cuenta en las componentes
+    constraints = frontier_constraints(codes)
+    safe, mines = solve_constraints(constraints)
+    probabilities[list(safe)] = 0.0
+    probabilities[list(mines)] = 1.0
+    mines_left -= len(mines)
+
+    components = []
+    approximate = {}
+    for component in split_components(reduce_constraints(constraints, safe, mines)):
+        solved = solve_cached(component, max(mines_left, 0))
+        if solved is None:
+            approximate.update(local_density(component))
+            continue
+        cells, counts, cell_counts = solved
+        total = counts.sum()
+        if total == 0:
+            continue  # Componente imposible (banderas mal puestas): se trata como interior
+        # Cada componente se escala por separado (no cambia las probabilidades)
+        components.append((cells, counts / total, cell_counts / total))
+
+    if approximate:
+        probabilities[list(approximate)] = list(approximate.values())
+        mines_left -= round(sum(approximate.values()))
+
+    frontier = {cell for cells, _, _ in components for cell in cells} | approximate.keys()
+    interior = [i for i in np.flatnonzero(hidden) if i not in frontier and i not in safe and i not in mines]
+
+    # Distribución de minas en toda la frontera y las de todas menos una
+    prefix = [np.ones(1)]
+    for _, counts, _ in components:
+        prefix.append(np.convolve(prefix[-1], counts))
+    suffix = [np.ones(1)]
+    for _, counts, _ in reversed(components):
+        suffix.append(np.convolve(suffix[-1], counts))
+    suffix.reverse()
+    frontier_counts = prefix[-1]
+
+    # Peso de cada total k de la frontera: formas de repartir el resto en el interior
+    weights = np.zeros(len(frontier_counts))
+    rest = mines_left - np.arange(len(frontier_counts))
+    valid = (rest >= 0) & (rest <= len(interior))
+    if valid.any():
+        log_weights = np.array([_log_comb(len(interior), r) for r in rest[valid]])
+        weights[valid] = np.exp(log_weights - log_weights.max())
+    if not (frontier_counts * weights).any():
+        weights[:] = 1.0  # Recuento de minas incoherente: cada componente por su cuenta
+    norm = (frontier_counts * weights).sum()
+
+    for i, (cells, counts, cell_counts) in enumerate(components):
+        others = np.convolve(prefix[i], suffix[i + 1])
+        # Peso de cada m de esta componente sumado sobre las demás
+        scale = np.array([others @ weights[m:m + len(others)] for m in range(len(counts))])
+        probabilities[cells] = scale @ cell_counts / norm
+
+    if interior:
+        expected = (frontier_counts * weights * np.clip(rest, 0, len(interior))).sum() / norm
+        probabilities[interior] = min(expected / len(interior), 1.0)
+
+    return probabilities.reshape(codes.shape)
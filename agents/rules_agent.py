@@ -1,164 +1,134 @@
 from agents.base_agent import BaseAgent
-from settings import ROWS, COLS
+from agents.solver import FrontierSolver, neighbor_lists
+from agents.probability import mine_probabilities
+from utils.state_encoder import state_to_codes, CODE_HIDDEN, CODE_FLAG
+from settings import AMOUNT_MINES
+import numpy as np
 import random
 
+# Sin jugada segura: casilla con menor probabilidad de mina o cualquiera al azar
+GUESS_STRATEGIES = ('safest', 'random')
+
 class RulesAgent(BaseAgent):
-    def __init__(self):
+    def __init__(self, rng=None, subsets=True, guess='safest', amount_mines=AMOUNT_MINES):
         super().__init__()
+        self.amount_mines = amount_mines  # Minas del tablero, para las probabilidades al apostar
+        # Generador propio (random.Random) para que cada proceso sea reproducible
+        self.rng = rng if rng is not None else random
+        self.frontier = FrontierSolver(subsets)  # Frontera que se conserva entre jugadas
+        if guess not in GUESS_STRATEGIES:
+            raise ValueError(f"Estrategia de apuesta inválida: {guess} (opciones: {', '.join(GUESS_STRATEGIES)})")
+        self.guess = guess
     
     def predict_action(self, state, flags_remaining=None):
+        actions = self.predict_actions(state, flags_remaining)
+        return actions[0] if actions else None
+    
+    def predict_actions(self, state, flags_remaining=None, chord=False, changed=None):
+        """
+        Todas las jugadas deducibles de una vez, en el orden en que se aplican:
+        revelar cada casilla segura y marcar cada mina segura (mientras queden
+        banderas). Si no hay ninguna, una sola apuesta.
+
+        Con chord, las casillas seguras que rodean a un número satisfecho por
+        sus banderas se revelan con un acorde sobre el número, detrás de las
+        banderas que lo satisfacen.
+
+        Con changed (casillas que cambiaron desde la llamada anterior de esta
+        misma partida, p. ej. la unión de info['changed']) solo se revisa lo
+        que tocan esos cambios; sin él se reconstruye toda la frontera.
+
+        Returns:
+            Lista de acciones (tipo, fila, columna); vacía si el juego terminó
+        """
         # Verificar si el juego está activo
         game_active = state[0, 0, 5] > 0.5
         if not game_active:
-            return None
+            return []
         
-        if self._is_board_completely_hidden(state):
-            return self._get_random_hidden_tile(state)
+        if changed is None or self.frontier.codes is None:
+            self.frontier.reset(state_to_codes(state))
+        elif changed:
+            rows, cols = (list(axis) for axis in zip(*changed))
+            self.frontier.update(zip(rows, cols), state_to_codes(state[rows, cols]))
+        codes = self.frontier.grid
         
-        # Regla 1: Números satisfechos - revelar casillas seguras
-        safe_action = self._find_safe_tiles(state)
-        if safe_action:
-            return safe_action
+        if self._is_board_completely_hidden(codes):
+            return [self._get_random_hidden_tile(codes)]
         
-        # Regla 2: Números con todas las minas identificadas - marcar minas
-        mine_action = self._find_mines(state, flags_remaining)
-        if mine_action:
-            return mine_action
+        # Todas las casillas seguras y minas deducibles de la frontera
+        safe_tiles, mines = self.frontier.solve()
         
-        random_action = self._get_random_hidden_tile(state)
-        return random_action
-    
-    def _is_board_completely_hidden(self, state):
-        """Verifica si todo el tablero está sin revelar"""
-        for row in range(ROWS):
-            for col in range(COLS):
-                if state[row, col, 0] < 0.5:  # Si está revelado
-                    return False
-        return True
-    
-    def _get_random_hidden_tile(self, state):
-        """Devuelve una casilla sin revelar aleatoria"""
-        hidden_tiles = []
-        for row in range(ROWS):
-            for col in range(COLS):
-                if state[row, col, 0] > 0.5:  # Si está sin revelar
-                    hidden_tiles.append(('left', row, col))
+        # Solo tantas banderas como queden
+        if flags_remaining is not None:
+            mines = mines[:max(flags_remaining, 0)]
         
-        return random.choice(hidden_tiles) if hidden_tiles else None
-    
-    def _find_safe_tiles(self, state):
-        """Encuentra casillas seguras para revelar"""
-        for row in range(ROWS):
-            for col in range(COLS):
-                # Solo procesar casillas que son números revelados
-                if not self._is_revealed_number(state, row, col):
-                    continue
-                
-                number = self._get_number_value(state, row, col)
-                if number == 0:
-                    continue
-                
-                # Obtener vecinos
-                hidden_neighbors = self._get_hidden_neighbors(state, row, col)
-                flag_neighbors = self._get_flag_neighbors(state, row, col)
-                
-                # Si el número de banderas == número, las casillas ocultas son seguras
-                if len(flag_neighbors) == number and hidden_neighbors:
-                    target_row, target_col = hidden_neighbors[0]
-                    return ('left', target_row, target_col)
+        chords = []
+        if chord:
+            chords, safe_tiles = self._plan_chords(codes, safe_tiles, mines)
         
-        return None
-    
-    def _find_mines(self, state, flags_remaining):
-        """Encuentra minas para marcar con banderas"""
-        # Verificar si tenemos banderas disponibles
-        if flags_remaining is not None and flags_remaining <= 0:
-            return None
+        # Casillas seguras, después banderas y al final los acordes (necesitan las banderas)
+        actions = ([('left', row, col) for row, col in safe_tiles]
+                   + [('right', row, col) for row, col in mines]
+                   + [('chord', row, col) for row, col in chords])
+        if actions:
+            return actions
         
-        for row in range(ROWS):
-            for col in range(COLS):
-                # Solo procesar casillas que son números revelados
-                if not self._is_revealed_number(state, row, col):
-                    continue
-                
-                number = self._get_number_value(state, row, col)
-                if number == 0:
-                    continue
-                
-                # Obtener vecinos
-                hidden_neighbors = self._get_hidden_neighbors(state, row, col)
-                flag_neighbors = self._get_flag_neighbors(state, row, col)
-                
-                # Si casillas ocultas + banderas == número, las ocultas son minas
-                total_mines_around = len(hidden_neighbors) + len(flag_neighbors)
-                if total_mines_around == number and hidden_neighbors:
-                    # Verificar que no excedamos las banderas disponibles
-                    if flags_remaining is not None and len(hidden_neighbors) > flags_remaining:
-                        continue
-                    
-                    target_row, target_col = hidden_neighbors[0]
-                    return ('right', target_row, target_col)
-        
-        return None
+        if self.guess == 'safest':
+            return [self._get_safest_tile(codes)]
+        return [self._get_random_hidden_tile(codes)]
     
-    def _is_revealed_number(self, state, row, col):
-        """Verifica si una casilla es un número revelado"""
-        # Características: [sin_revelar, bandera, es_numero, espacio_vacio, valor_numero, juego_activo]
-        is_hidden = state[row, col, 0] > 0.5      # Sin revelar
-        has_flag = state[row, col, 1] > 0.5       # Con bandera
-        is_number = state[row, col, 2] > 0.5      # Es número
+    def _plan_chords(self, codes, safe_tiles, mines):
+        """
+        Agrupa casillas seguras en acordes: un número cuyas banderas (ya
+        puestas o de esta tanda) igualan su valor revela todas sus vecinas
+        ocultas, que tienen que ser seguras. Solo compensa si revela dos o más.
+
+        Returns:
+            (acordes, casillas seguras que siguen necesitando su propio clic)
+        """
+        rows, cols = codes.shape
+        flat = codes.ravel()
+        neighbors = neighbor_lists(rows, cols)
+        safe = {row * cols + col for row, col in safe_tiles}
+        planned_flags = {row * cols + col for row, col in mines}
+        pending = set(safe)
         
-        # Es número revelado si: es_numero=True Y sin_revelar=False Y bandera=False
-        return is_number and not is_hidden and not has_flag
-    
-    def _get_number_value(self, state, row, col):
-        """Obtiene el valor numérico de una casilla"""
-        if not self._is_revealed_number(state, row, col):
-            return 0
+        # Solo los números junto a alguna casilla segura
+        numbers = sorted({n for index in safe for n in neighbors[index] if 1 <= flat[n] <= 8})
         
-        # El valor está normalizado (0-1), desnormalizar a 1-8
-        normalized_value = state[row, col, 4]
-        return int(round(normalized_value * 8))
-    
-    def _get_neighbors(self, row, col):
-        """Obtiene las coordenadas de todas las casillas vecinas"""
-        neighbors = []
-        for dr in [-1, 0, 1]:
-            for dc in [-1, 0, 1]:
-                if dr == 0 and dc == 0:
-                    continue
-                
-                new_row = row + dr
-                new_col = col + dc
-                
-                if 0 <= new_row < ROWS and 0 <= new_col < COLS:
-                    neighbors.append((new_row, new_col))
+        chords = []
+        for index in numbers:
+            around = neighbors[index]
+            targets = [n for n in around if n in pending]
+            if len(targets) < 2:
+                continue
+            flags = [n for n in around if flat[n] == CODE_FLAG or n in planned_flags]
+            hidden = [n for n in around if flat[n] == CODE_HIDDEN and n not in planned_flags]
+            if len(flags) != flat[index] or not all(n in safe for n in hidden):
+                continue
+            chords.append(divmod(index, cols))
+            pending.difference_update(targets)
         
-        return neighbors
+        return chords, [divmod(index, cols) for index in sorted(pending)]
     
-    def _get_hidden_neighbors(self, state, row, col):
-        """Obtiene vecinos que están sin revelar y sin bandera"""
-        neighbors = self._get_neighbors(row, col)
-        hidden = []
-        
-        for nr, nc in neighbors:
-            is_hidden = state[nr, nc, 0] > 0.5    # Sin revelar
-            has_flag = state[nr, nc, 1] > 0.5     # Con bandera
-            
-            if is_hidden and not has_flag:
-                hidden.append((nr, nc))
-        
-        return hidden
+    def _is_board_completely_hidden(self, codes):
+        """Verifica si todo el tablero está sin revelar"""
+        return bool(np.all(codes == CODE_HIDDEN))
     
-    def _get_flag_neighbors(self, state, row, col):
-        """Obtiene vecinos que tienen bandera"""
-        neighbors = self._get_neighbors(row, col)
-        flagged = []
-        
-        for nr, nc in neighbors:
-            has_flag = state[nr, nc, 1] > 0.5     # Con bandera
-            
-            if has_flag:
-                flagged.append((nr, nc))
-        
-        return flagged
\ No newline at end of file
+    def _get_random_hidden_tile(self, codes):
+        """Devuelve una casilla sin revelar aleatoria"""
+        hidden_tiles = [('left', int(row), int(col)) for row, col in np.argwhere(codes == CODE_HIDDEN)]
+        return self.rng.choice(hidden_tiles) if hidden_tiles else None
+    
+    def _get_safest_tile(self, codes):
+        """Casilla con menor probabilidad exacta de mina (al azar entre empates)"""
+        mines_left = self.amount_mines - int(np.count_nonzero(codes == CODE_FLAG))
+        probabilities = mine_probabilities(codes, mines_left)
+        hidden = codes == CODE_HIDDEN
+        if not hidden.any():
+            return None
+        lowest = probabilities[hidden].min()
+        candidates = np.argwhere(hidden & (probabilities <= lowest + 1e-9))
+        row, col = candidates[self.rng.randrange(len(candidates))]
+        return ('left', int(row), int(col))
@@ -0,0 +1,314 @@
+#solver.py
+# Motor de deducción del agente de reglas. La frontera (números revelados
+# junto a casillas ocultas) se guarda como restricciones lineales:
+# "entre estas casillas ocultas hay exactamente k minas". Comparando las
+# restricciones que se solapan se deducen de una vez todas las casillas
+# seguras y todas las minas que se pueden asegurar.
+from collections import defaultdict
+from functools import lru_cache
+import numpy as np
+from game.engine import compute_clues
+from utils.state_encoder import CODE_HIDDEN, CODE_FLAG, CODE_UNKNOWN
+
+@lru_cache(maxsize=None)
+def neighbor_lists(rows, cols):
+    """neighbors[i] = tupla con los índices planos de los vecinos de la casilla i"""
+    neighbors = []
+    for row in range(rows):
+        for col in range(cols):
+            neighbors.append(tuple(
+                r * cols + c
+                for r in range(max(row - 1, 0), min(row + 2, rows))
+                for c in range(max(col - 1, 0), min(col + 2, cols))
+                if (r, c) != (row, col)
+            ))
+    return tuple(neighbors)
+
+def frontier_constraints(codes):
+    """
+    Restricciones de la frontera de una rejilla de códigos (ROWS, COLS).
+
+    Returns:
+        dict {frozenset(índices planos ocultos sin bandera): minas entre ellos}
+        con una entrada por número revelado que toca casillas ocultas
+    """
+    codes = np.asarray(codes)
+    rows, cols = codes.shape
+    flat = codes.ravel()
+    hidden = flat == CODE_HIDDEN
+    flagged = flat == CODE_FLAG
+    neighbors = neighbor_lists(rows, cols)
+
+    constraints = {}
+    touching = compute_clues(codes == CODE_HIDDEN).ravel() > 0
+    for index in np.flatnonzero((flat >= 1) & (flat <= 8) & touching):
+        cells = frozenset(n for n in neighbors[index] if hidden[n])
+        mines = int(flat[index]) - sum(1 for n in neighbors[index] if flagged[n])
+        constraints[cells] = mines
+    return constraints
+
+def reduce_constraints(constraints, safe, mines):
+    """Quita las casillas ya resueltas (descuenta las minas) y las restricciones vacías o imposibles"""
+    reduced = {}
+    for cells, count in constraints.items():
+        known_mines = len(cells & mines)
+        cells = cells - safe - mines
+        count -= known_mines
+        # Banderas mal puestas pueden dejar restricciones imposibles: se ignoran
+        if cells and 0 <= count <= len(cells):
+            reduced[cells] = count
+    return reduced
+
+def _derive(first, first_count, second, second_count):
+    """
+    Restricciones nuevas a partir de dos que se solapan.
+
+    - Subconjunto: si A ⊂ B, en B - A hay b - a minas.
+    - Diferencia: si b - a == |B - A|, todas las de B - A son minas y las
+      de A - B son seguras (las a minas de A caen en A ∩ B).
+    """
+    if first < second:
+        return [(second - first, second_count - first_count)]
+    if second < first:
+        return [(first - second, first_count - second_count)]
+
+    derived = []
+    for (a, a_count), (b, b_count) in (((first, first_count), (second, second_count)),
+                                       ((second, second_count), (first, first_count))):
+        only_b = b - a
+        if b_count - a_count == len(only_b):
+            derived.append((only_b, len(only_b)))
+            derived.append((a - b, 0))
+    return derived
+
+def solve_constraints(constraints, subsets=True):
+    """
+    Deduce las casillas seguras y las minas seguras de un conjunto de restricciones.
+
+    Aplica hasta no avanzar más: las reglas de una sola restricción (0 minas:
+    todas seguras; tantas minas como casillas: todas minas) y, con subsets,
+    el razonamiento de subconjuntos/diferencias entre restricciones solapadas.
+
+    Returns:
+        (safe, mines): conjuntos de índices planos
+    """
+    safe, mines = set(), set()
+    constraints = reduce_constraints(constraints, safe, mines)
+
+    while constraints:
+        new_safe, new_mines = set(), set()
+        for cells, count in constraints.items():
+            if count == 0:
+                new_safe |= cells
+            elif count == len(cells):
+                new_mines |= cells
+
+        if new_safe or new_mines:
+            safe |= new_safe
+            mines |= new_mines
+            constraints = reduce_constraints(constraints, safe, mines)
+            continue
+
+        if not subsets:
+            break
+
+        # Solo se comparan las parejas que comparten alguna casilla
+        by_cell = defaultdict(list)
+        for cells in constraints:
+            for cell in cells:
+                by_cell[cell].append(cells)
+
+        added = False
+        seen = set()
+        for touching in by_cell.values():
+            for i, first in enumerate(touching):
+                for second in touching[i + 1:]:
+                    pair = (first, second)
+                    if pair in seen:
+                        continue
+                    seen.add(pair)
+                    for cells, count in _derive(first, constraints[first], second, constraints[second]):
+                        if cells and cells not in constraints:
+                            constraints[cells] = count
+                            added = True
+        if not added:
+            break
+        constraints = reduce_constraints(constraints, safe, mines)
+
+    return safe, mines
+
+def find_certain_cells(codes, subsets=True):
+    """
+    Todas las casillas seguras y todas las minas deducibles de una rejilla de códigos.
+
+    Returns:
+        (safe, mines): listas de (fila, columna) ordenadas por filas
+    """
+    cols = np.shape(codes)[1]
+    safe, mines = solve_constraints(frontier_constraints(codes), subsets)
+    return ([divmod(index, cols) for index in sorted(safe)],
+            [divmod(index, cols) for index in sorted(mines)])
+
+class FrontierSolver:
+    """
+    Restricciones de la frontera que se conservan entre jugadas.
+
+    Cada jugada solo procesa las casillas que cambiaron (reveladas o con
+    bandera): se quitan de las restricciones que las contienen, se añaden
+    las de los números nuevos y únicamente esas restricciones "sucias"
+    vuelven a compararse con las que se solapan. Lo ya deducido (restricciones
+    derivadas y casillas seguras/minas aún sin jugar) se mantiene, así que el
+    coste de cada jugada depende del cambio y no del tamaño del tablero.
+    """
+    def __init__(self, subsets=True):
+        self.subsets = subsets
+        self.codes = None           # Códigos planos del último estado visto
+        self.rows = self.cols = 0
+        self.constraints = {}       # frozenset(casillas) -> minas
+        self.by_cell = defaultdict(set)
+        self.dirty = []             # Restricciones pendientes de revisar
+        self.safe = set()           # Deducidas y todavía ocultas
+        self.mines = set()
+
+    @property
+    def grid(self):
+        """Vista (ROWS, COLS) de los códigos actuales"""
+        return self.codes.reshape(self.rows, self.cols)
+
+    def reset(self, codes):
+        """Reconstruye todo a partir de una rejilla de códigos (ROWS, COLS)"""
+        codes = np.asarray(codes)
+        self.rows, self.cols = codes.shape
+        self.codes = codes.ravel().astype(np.uint8)
+        self.neighbors = neighbor_lists(self.rows, self.cols)
+        self.constraints = {}
+        self.by_cell = defaultdict(set)
+        self.dirty = []
+        self.safe, self.mines = set(), set()
+        # Solo los números que tocan alguna casilla oculta
+        touching = compute_clues(codes == CODE_HIDDEN).ravel() > 0
+        for index in np.flatnonzero((self.codes >= 1) & (self.codes <= 8) & touching).tolist():
+            self._add_number(index)
+
+    def update(self, cells, codes):
+        """
+        Aplica los cambios de una o varias jugadas.
+
+        Args:
+            cells: casillas (fila, columna) que cambiaron (info['changed'])
+            codes: sus códigos nuevos, en el mismo orden
+        """
+        revealed, flagged = [], []
+        rebuild = False
+        for (row, col), code in zip(cells, codes):
+            index = row * self.cols + col
+            old = self.codes[index]
+            if code == old:
+                continue
+            self.codes[index] = code
+            if old != CODE_HIDDEN or code == CODE_UNKNOWN:
+                rebuild = True
+            elif code == CODE_FLAG:
+                flagged.append(index)
+            else:
+                revealed.append(index)
+
+        if rebuild:
+            # Bandera quitada o fin de partida: las deducciones ya no valen
+            self.reset(self.grid.copy())
+            return
+
+        # Primero sacar las casillas resueltas y después añadir los números
+        # nuevos, que ya se construyen con los códigos definitivos
+        for index in revealed:
+            self._settle(index, False)
+        for index in flagged:
+            self._settle(index, True)
+        for index in revealed:
+            if self.codes[index] >= 1:
+                self._add_number(index)
+
+    def _settle(self, index, mine):
+        """Una casilla deja de ser incógnita: se quita de sus restricciones"""
+        if index in self.safe or index in self.mines:
+            # Ya deducida: solo faltaba jugarla
+            self.safe.discard(index)
+            self.mines.discard(index)
+            return
+        self._remove_cell(index, mine)
+
+    def _remove_cell(self, index, mine):
+        for cells in self.by_cell.pop(index, ()):
+            count = self.constraints.pop(cells)
+            for cell in cells:
+                if cell != index:
+                    self.by_cell[cell].discard(cells)
+            self._add(cells - {index}, count - mine)
+
+    def _add_number(self, index):
+        codes = self.codes
+        count = int(codes[index])
+        cells = []
+        for n in self.neighbors[index]:
+            code = codes[n]
+            if code == CODE_FLAG or n in self.mines:
+                count -= 1
+            elif code == CODE_HIDDEN and n not in self.safe:
+                cells.append(n)
+        # Las casillas ya deducidas no entran: sus minas se descuentan
+        self._add(frozenset(cells), count)
+
+    def _add(self, cells, count):
+        # Banderas mal puestas pueden dejar restricciones imposibles: se ignoran
+        if not cells or not 0 <= count <= len(cells) or cells in self.constraints:
+            return
+        self.constraints[cells] = count
+        for cell in cells:
+            self.by_cell[cell].add(cells)
+        self.dirty.append(cells)
+
+    def solve(self):
+        """
+        Revisa las restricciones sucias hasta vaciar la lista de trabajo.
+
+        Returns:
+            (safe, mines): listas de (fila, columna), ordenadas por filas, con
+            todo lo deducido que sigue oculto
+        """
+        while self.dirty:
+            pending, self.dirty = self.dirty, []
+
+            # Primero las reglas de una sola restricción, que son baratas
+            compare = []
+            for cells in pending:
+                count = self.constraints.get(cells)
+                if count is None:
+                    continue
+                if count == 0 or count == len(cells):
+                    found = self.mines if count else self.safe
+                    for cell in cells:
+                        found.add(cell)
+                        self._remove_cell(cell, bool(count))
+                else:
+                    compare.append(cells)
+            if self.dirty:
+                self.dirty.extend(compare)
+                continue
+
+            if not self.subsets:
+                break
+            # Después, cada restricción sucia contra las que se solapan con ella
+            for cells in compare:
+                count = self.constraints.get(cells)
+                if count is None:
+                    continue
+                overlapping = set()
+                for cell in cells:
+                    overlapping |= self.by_cell[cell]
+                overlapping.discard(cells)
+                for other in overlapping:
+                    for derived, derived_count in _derive(cells, count, other, self.constraints[other]):
+                        self._add(derived, derived_count)
+
+        return ([divmod(index, self.cols) for index in sorted(self.safe)],
+                [divmod(index, self.cols) for index in sorted(self.mines)])
@@ -2,194 +2,202 @@ import numpy as np
 import pickle
 import os
 from collections import deque
-from settings import ROWS, COLS
-import pygame
-from game.game import Game
-from ai.model import board_to_state
+from itertools import islice
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from settings import WIDTH, HEIGHT
+from settings import ROWS, COLS
 from agents.rules_agent import RulesAgent
+from ai.dataset import ShardWriter, ShardedDataset, read_manifest, to_model_batch
+from ai.self_play import ACTION_TYPES
+from utils.state_encoder import state_to_codes
+
+# Dataset por fragmentos (ver ai/dataset.py) y el pickle único de versiones anteriores
+DATA_DIR = "data/training_data"
+LEGACY_DATA_FILE = "data/training_data.pkl"
+
+def _tail(buffer, count):
+    """Últimos `count` elementos de un deque sin copiar el resto"""
+    return list(islice(reversed(buffer), count))[::-1]
 
 class DataCollector:
-    def __init__(self, max_samples=50000):
-        self.states = deque(maxlen=max_samples)
-        self.left_targets = deque(maxlen=max_samples)
-        self.right_targets = deque(maxlen=max_samples)
+    """
+    Muestras compactas: rejilla de códigos de casilla uint8 y un par
+    (acción 0=left/1=right, índice fila * COLS + columna). Los tensores float
+    y los objetivos one-hot se construyen al formar cada lote (ver ai/dataset.py).
+    """
+    def __init__(self, max_samples=None):
+        # max_samples solo limita la memoria de esta sesión; el disco no tiene límite
+        self.codes = deque(maxlen=max_samples)
+        self.actions = deque(maxlen=max_samples)
+        self.indices = deque(maxlen=max_samples)
         self.sample_count = 0
+        self.unsaved_count = 0  # Muestras del final que aún no están en disco
         self.rules_agent = RulesAgent()  
         
     def add_sample(self, state, action_type, row, col):
-        # Crear targets
-        left_target = np.zeros(ROWS * COLS, dtype=np.float32)
-        right_target = np.zeros(ROWS * COLS, dtype=np.float32)
-        
-        # Convertir (row, col) a índice flat
-        target_index = row * COLS + col
-        
-        if action_type == 'left':
-            left_target[target_index] = 1.0
-        elif action_type == 'right':
-            right_target[target_index] = 1.0
-        else:
+        """Añade una jugada; state es el tensor (ROWS, COLS, 6) previo a ella"""
+        if action_type not in ACTION_TYPES:
             print(f"⚠️ Tipo de acción inválido: {action_type}")
             return
         
-        # Guardar muestra
-        self.states.append(state.copy())
-        self.left_targets.append(left_target.copy())
-        self.right_targets.append(right_target.copy())
+        # Guardar muestra (state_to_codes ya devuelve una copia compacta)
+        self.codes.append(state_to_codes(state))
+        self.actions.append(ACTION_TYPES.index(action_type))
+        self.indices.append(row * COLS + col)
         self.sample_count += 1
+        self.unsaved_count += 1
         
         if self.sample_count % 100 == 0:
             print(f"📊 Muestras recolectadas: {self.sample_count}")
     
+    def add_samples(self, codes, actions, rows, cols):
+        """Añade un bloque de muestras (codes (N, ROWS, COLS); actions: 0=left, 1=right) de una vez"""
+        count = len(actions)
+        if count == 0:
+            return
+        
+        self.codes.extend(np.asarray(codes, dtype=np.uint8))
+        self.actions.extend(np.asarray(actions, dtype=np.uint8))
+        self.indices.extend(np.asarray(rows) * COLS + np.asarray(cols))
+        self.sample_count += count
+        self.unsaved_count += count
+    
+    def _fields(self, count=None):
+        """Campos compactos de las últimas `count` muestras (todas si es None)"""
+        count = len(self.codes) if count is None else count
+        return {
+            'codes': np.array(_tail(self.codes, count), dtype=np.uint8).reshape(-1, ROWS, COLS),
+            'actions': np.array(_tail(self.actions, count), dtype=np.uint8),
+            'indices': np.array(_tail(self.indices, count), dtype=np.uint16)
+        }
+    
     def get_dataset(self):
         """Retorna el dataset para entrenamiento"""
-        if len(self.states) == 0:
+        if len(self.codes) == 0:
             print("❌ No hay datos para entrenar")
             return None, None
-            
-        X = np.array(self.states)
-        y = [np.array(self.left_targets), np.array(self.right_targets)]
+        
+        X, y = to_model_batch(self._fields())
         
         print(f"📊 Dataset creado: {len(X)} muestras")
         return X, y
     
-    def save_data(self, filepath="data/training_data.pkl"):
-        """Guarda los datos recolectados"""
-        os.makedirs(os.path.dirname(filepath), exist_ok=True)
-        
-        data = {
-            'states': list(self.states),
-            'left_targets': list(self.left_targets),
-            'right_targets': list(self.right_targets),
-            'sample_count': self.sample_count
-        }
+    def save_data(self, directory=DATA_DIR):
+        """
+        Añade al dataset en disco solo las muestras nuevas desde el último guardado
+        
+        Returns:
+            Número de muestras escritas
+        """
+        pending = min(self.unsaved_count, len(self.codes))
+        if pending == 0:
+            return 0
         
         try:
-            with open(filepath, 'wb') as f:
-                pickle.dump(data, f)
-            print(f"💾 Datos guardados en {filepath}")
+            writer = ShardWriter(directory)
+            writer.append(**self._fields(pending))
+            self.unsaved_count = 0
+            print(f"💾 {pending} muestras nuevas guardadas en {directory} ({writer.sample_count} en total)")
+            return pending
         except Exception as e:
             print(f"❌ Error guardando datos: {e}")
+            return 0
     
-    def load_data(self, filepath="data/training_data.pkl"):
-        """Carga datos previamente guardados"""
-        if not os.path.exists(filepath):
-            print(f"📄 Archivo {filepath} no encontrado")
+    def load_data(self, directory=DATA_DIR):
+        """Carga en memoria datos previamente guardados (dataset por fragmentos o pickle antiguo)"""
+        if directory.endswith('.pkl'):
+            return self._load_legacy_data(directory)
+        
+        if read_manifest(directory) is None:
+            if directory == DATA_DIR and os.path.exists(LEGACY_DATA_FILE):
+                return self._load_legacy_data(LEGACY_DATA_FILE)
+            print(f"📄 Dataset {directory} no encontrado")
             return
         
+        try:
+            for shard in ShardedDataset(directory).iter_shards():
+                self.codes.extend(shard['codes'])
+                self.actions.extend(shard['actions'])
+                self.indices.extend(shard['indices'])
+            self.sample_count = len(self.codes)
+            
+            print(f"📂 Datos cargados: {self.sample_count} muestras")
+        except Exception as e:
+            print(f"❌ Error cargando datos: {e}")
+    
+    def migrate_legacy_data(self, directory=DATA_DIR, filepath=LEGACY_DATA_FILE):
+        """Convierte el pickle antiguo en dataset por fragmentos si aún no existe uno"""
+        if read_manifest(directory) is not None or not os.path.exists(filepath):
+            return False
+        
+        legacy = DataCollector()
+        legacy._load_legacy_data(filepath)
+        return legacy.save_data(directory) > 0
+    
+    def _load_legacy_data(self, filepath):
+        """Lee el pickle único antiguo; sus muestras se migran al dataset en el próximo save_data"""
         try:
             with open(filepath, 'rb') as f:
                 data = pickle.load(f)
             
-            self.states.extend(data['states'])
-            self.left_targets.extend(data['left_targets'])
-            self.right_targets.extend(data['right_targets'])
-            self.sample_count = len(self.states)
+            # Estados float y objetivos one-hot -> formato compacto
+            left_targets = np.array(data['left_targets'])
+            is_right = ~left_targets.any(axis=1)
+            indices = np.where(is_right, np.argmax(data['right_targets'], axis=1), np.argmax(left_targets, axis=1))
             
-            print(f"📂 Datos cargados: {self.sample_count} muestras")
+            self.codes.extend(state_to_codes(np.array(data['states'])))
+            self.actions.extend(is_right.astype(np.uint8))
+            self.indices.extend(indices)
+            self.sample_count = len(self.codes)
+            self.unsaved_count += len(indices)
+            
+            print(f"📂 Datos cargados (formato antiguo): {len(indices)} muestras")
         except Exception as e:
             print(f"❌ Error cargando datos: {e}")
     
     def clear_data(self):
         """Limpia todos los datos"""
-        self.states.clear()
-        self.left_targets.clear()
-        self.right_targets.clear()
+        self.codes.clear()
+        self.actions.clear()
+        self.indices.clear()
         self.sample_count = 0
+        self.unsaved_count = 0
         print("🗑️ Datos limpiados")
 
-    def _print_board_state(self, game):
-        """Muestra el estado actual del tablero de forma segura"""
-        try:
-            print("\nEstado del tablero:")
-            for row in range(ROWS):
-                for col in range(COLS):
-                    try:
-                        tile_type, _, _ = game.tile_analyzer.analyze_tile(game.screen, col, row)
-                        print(f"({row},{col}): {tile_type[:15]:<15}", end=" | ")
-                    except Exception as e:
-                        print(f"({row},{col}): Error {str(e)[:10]:<10}", end=" | ")
-                print()
-        except Exception as e:
-            print(f"Error al imprimir estado del tablero: {e}")
-
-    def generate_rule_based_data(self, num_samples=5000):
-        print("🎮 Iniciando generación automática de datos...")
+    def generate_rule_based_data(self, num_samples=5000, workers=None, seed=0, directory=None):
+        """
+        Genera datos con el agente de reglas en varios procesos, sin pantalla.
+        
+        Cada proceso juega lotes de partidas con su propia semilla y los lotes
+        se unen en orden, así que el resultado es reproducible para una semilla.
+        
+        Args:
+            workers: número de procesos (por defecto, todos los núcleos)
+            directory: si se indica, las muestras se añaden directamente a ese
+                dataset en disco en lugar de quedarse en memoria
+        """
+        from ai.self_play import generate_rule_shards
+        
+        workers = workers or os.cpu_count() or 1
+        print(f"🎮 Generación automática en {workers} procesos...")
         
+        writer = ShardWriter(directory) if directory else None
         samples_generated = 0
         games_played = 0
         
-        # Asegurar que pygame esté inicializado
-        if not pygame.get_init():
-            pygame.init()
-            screen = pygame.display.set_mode((WIDTH, HEIGHT))
-        
-        while samples_generated < num_samples and games_played < 1000:
-            try:
-                game = Game()
-                print(f"\n🔹 Juego {games_played + 1}")
-                
-                # Mostrar estado inicial de depuración
-                game_state, _, _ = game.tile_analyzer.analyze_face_state(game.screen)
-                print(f"Estado inicial: {game_state}")
-                
-                # Mostrar tablero inicial (solo si hay menos de 5 juegos para no saturar)
-                if games_played < 5:
-                    self._print_board_state(game)
-                
-                moves_in_game = 0
-                
-                while game.game_active and moves_in_game < 200:
-                    try:
-                        # Obtener estado actual
-                        current_state = board_to_state(game.screen, game.tile_analyzer)
-                        
-                        # Obtener acción de las reglas
-                        action = self.rules_agent.predict_action(current_state, game.flags_remaining)
-                        
-                        if not action:
-                            if games_played < 3:  # Solo mostrar en los primeros juegos
-                                print("⚠️ No se encontraron acciones válidas")
-                            break
-                        
-                        action_type, row, col = action
-                        
-                        # Registrar muestra
-                        self.add_sample(current_state, action_type, row, col)
-                        samples_generated += 1
-                        
-                        # Ejecutar acción
-                        if action_type == 'left':
-                            if not game.board.dig(col, row):
-                                break
-                        elif action_type == 'right':
-                            tile = game.board.board_list[col][row]
-                            if not tile.revealed and not tile.flagged and game.flags_remaining > 0:
-                                tile.flagged = True
-                                game.flags_remaining -= 1
-                        
-                        # Actualizar pantalla
-                        game.draw()
-                        pygame.display.flip()
-                        moves_in_game += 1
-                        
-                    except Exception as e:
-                        print(f"⚠️ Error durante el juego: {e}")
-                        break
-                    
-                games_played += 1
-                
-                # Mostrar progreso cada 10 juegos
-                if games_played % 10 == 0:
-                    print(f"📊 Progreso: {games_played} juegos | {samples_generated} muestras")
-                    
-            except Exception as e:
-                print(f"⚠️ Error al iniciar juego: {e}")
-                games_played += 1
-                continue
+        for shard in generate_rule_shards(num_samples, workers=workers, seed=seed):
+            remaining = num_samples - samples_generated
+            count = min(remaining, len(shard['actions']))
+            codes, actions = shard['codes'][:count], shard['actions'][:count]
+            rows, cols = shard['rows'][:count], shard['cols'][:count]
+            if writer:
+                writer.append(codes=codes, actions=actions.astype(np.uint8),
+                              indices=(rows * COLS + cols).astype(np.uint16))
+            else:
+                self.add_samples(codes, actions, rows, cols)
+            samples_generated += count
+            games_played += shard['games']
+            print(f"📊 Progreso: {games_played} juegos | {samples_generated} muestras")
         
         print(f"\n✅ Finalizado: {samples_generated} muestras de {games_played} juegos")
-        return samples_generated
\ No newline at end of file
+        return samples_generated
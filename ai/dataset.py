@@ -0,0 +1,564 @@
+#dataset.py
+# Dataset de entrenamiento en disco dividido en fragmentos (shards) de tamaño
+# fijo: un archivo binario por campo y fragmento (filas seguidas, sin
+# cabecera), más un manifest.json con el tipo, la forma y el recuento.
+# Escribir solo añade bytes al final; leer abre los fragmentos de uno en uno.
+# Cada muestra se guarda compacta: 'codes' (ROWS, COLS) uint8 con los códigos
+# de casilla, 'actions' uint8 (0=left, 1=right) e 'indices' uint16 (casilla).
+import json
+import os
+import numpy as np
+from utils.state_encoder import codes_to_state, CODE_HIDDEN, CODE_FLAG
+from ai.symmetry import augment_batch, augment_samples, canonicalize, gather_maps, index_maps
+
+MANIFEST_NAME = "manifest.json"
+LABELS_DIR = "labels"
+DEFAULT_SHARD_SIZE = 65536
+# Muestras de origen por cubo al eliminar repetidos (ver dedup_dataset)
+DEDUP_BUCKET_SIZE = 65536
+# Versión 1: fragmentos .npy reescritos enteros; versión 2: binarios ampliables
+MANIFEST_VERSION = 2
+
+def shard_path(directory, name, field, raw=True):
+    """Ruta del archivo de un campo de un fragmento (.bin, o .npy en datasets de la versión 1)"""
+    return os.path.join(directory, f"{name}_{field}.{'bin' if raw else 'npy'}")
+
+def _is_raw(manifest, shard):
+    return shard.get('format', 'raw' if manifest['version'] >= 2 else 'npy') == 'raw'
+
+def read_manifest(directory):
+    """Devuelve el manifiesto del dataset o None si el directorio no tiene uno"""
+    path = os.path.join(directory, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def _replace_file(path, write):
+    """Escribe en un temporal y lo renombra: un corte nunca deja el archivo a medias"""
+    temp_path = path + ".tmp"
+    with open(temp_path, 'wb') as f:
+        write(f)
+    os.replace(temp_path, path)
+
+class ShardWriter:
+    """
+    Añade muestras a un dataset por fragmentos.
+
+    Las muestras nuevas se añaden como bytes al final del último fragmento
+    (o de fragmentos nuevos) y después se reescribe el manifiesto: guardar
+    cuesta O(muestras nuevas) y no depende del tamaño del dataset. Si un
+    corte deja bytes de más tras el último recuento, el manifiesto los ignora
+    y el siguiente guardado los recorta.
+    """
+    def __init__(self, directory, shard_size=DEFAULT_SHARD_SIZE):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.manifest = read_manifest(directory) or {
+            'version': MANIFEST_VERSION,
+            'shard_size': shard_size,
+            'fields': None,
+            'shards': [],
+            'sample_count': 0
+        }
+        self.shard_size = self.manifest['shard_size']
+
+        if self.manifest['version'] < MANIFEST_VERSION:
+            # Los .npy antiguos se quedan como están; lo nuevo va en fragmentos binarios
+            for shard in self.manifest['shards']:
+                shard.setdefault('format', 'npy')
+            self.manifest['version'] = MANIFEST_VERSION
+
+    @property
+    def sample_count(self):
+        return self.manifest['sample_count']
+
+    def append(self, **fields):
+        """
+        Añade un bloque de muestras: cada campo es un array (N, ...)
+
+        Returns:
+            Número de muestras añadidas
+        """
+        arrays = {name: np.asarray(values) for name, values in fields.items()}
+        count = len(next(iter(arrays.values())))
+        if count == 0:
+            return 0
+
+        if self.manifest['fields'] is None:
+            self.manifest['fields'] = {name: {'dtype': str(array.dtype), 'shape': list(array.shape[1:])}
+                                       for name, array in arrays.items()}
+        elif set(arrays) != set(self.manifest['fields']):
+            raise ValueError(f"Campos {sorted(arrays)} distintos a los del dataset "
+                             f"{sorted(self.manifest['fields'])}")
+        arrays = {name: array.astype(self.manifest['fields'][name]['dtype'], copy=False)
+                  for name, array in arrays.items()}
+
+        shards = self.manifest['shards']
+        start = 0
+
+        # Completar el último fragmento si quedó a medias
+        if shards and shards[-1]['count'] < self.shard_size and _is_raw(self.manifest, shards[-1]):
+            tail = shards[-1]
+            start = min(self.shard_size - tail['count'], count)
+            self._append_shard(tail, {name: array[:start] for name, array in arrays.items()})
+
+        while start < count:
+            stop = min(start + self.shard_size, count)
+            shard = {'name': f"shard_{len(shards):05d}", 'count': 0}
+            self._append_shard(shard, {name: array[start:stop] for name, array in arrays.items()})
+            shards.append(shard)
+            start = stop
+
+        self.manifest['sample_count'] += count
+        manifest_path = os.path.join(self.directory, MANIFEST_NAME)
+        _replace_file(manifest_path, lambda f: f.write(json.dumps(self.manifest, indent=2).encode()))
+        return count
+
+    def _append_shard(self, shard, arrays):
+        """Añade filas al final de los archivos de un fragmento"""
+        for field, array in arrays.items():
+            row_bytes = array.dtype.itemsize * int(np.prod(array.shape[1:], dtype=np.int64))
+            with open(shard_path(self.directory, shard['name'], field), 'ab') as f:
+                f.truncate(shard['count'] * row_bytes)  # Restos de un guardado cortado
+                f.write(np.ascontiguousarray(array).tobytes())
+        shard['count'] += len(next(iter(arrays.values())))
+
+class ShardedDataset:
+    """Lectura perezosa de un dataset escrito con ShardWriter"""
+    def __init__(self, directory):
+        self.directory = directory
+        self.manifest = read_manifest(directory)
+        if self.manifest is None:
+            raise FileNotFoundError(f"No hay dataset en {directory}")
+        self._mapped = None
+
+        # Etiquetas agrupadas de un dataset sin repetidos (ver dedup_dataset)
+        labels_dir = os.path.join(directory, LABELS_DIR)
+        self.labels = ShardedDataset(labels_dir) if read_manifest(labels_dir) is not None else None
+
+    def __len__(self):
+        return self.manifest['sample_count']
+
+    @property
+    def fields(self):
+        return list(self.manifest['fields'] or {})
+
+    @property
+    def shards(self):
+        return self.manifest['shards']
+
+    def load_shard(self, index, mmap_mode=None):
+        """
+        Campos de un fragmento como dict de arrays.
+
+        Con mmap_mode='r' los arrays quedan mapeados en memoria: solo se leen
+        del disco las filas que se usan.
+        """
+        shard = self.shards[index]
+        if not _is_raw(self.manifest, shard):
+            return {field: np.load(shard_path(self.directory, shard['name'], field, raw=False), mmap_mode=mmap_mode)
+                    for field in self.fields}
+
+        arrays = {}
+        for field, spec in self.manifest['fields'].items():
+            path = shard_path(self.directory, shard['name'], field)
+            shape = (shard['count'],) + tuple(spec['shape'])
+            if mmap_mode is None:
+                arrays[field] = np.fromfile(path, dtype=spec['dtype'], count=int(np.prod(shape))).reshape(shape)
+            else:
+                arrays[field] = np.memmap(path, dtype=spec['dtype'], mode=mmap_mode, shape=shape)
+        return arrays
+
+    def iter_shards(self):
+        """Recorre los fragmentos en orden; solo uno está en memoria a la vez"""
+        for index in range(len(self.shards)):
+            yield self.load_shard(index)
+
+    def read_range(self, start, stop):
+        """Campos de las muestras globales [start, stop), aunque crucen fragmentos"""
+        if self._mapped is None:
+            self._mapped = [self.load_shard(index, mmap_mode='r') for index in range(len(self.shards))]
+            self._offsets = np.cumsum([0] + [shard['count'] for shard in self.shards])
+
+        first = int(np.searchsorted(self._offsets, start, side='right')) - 1
+        last = int(np.searchsorted(self._offsets, stop, side='left'))
+        parts = {field: [] for field in self.fields}
+        for index in range(max(first, 0), last):
+            offset = self._offsets[index]
+            for field in self.fields:
+                parts[field].append(self._mapped[index][field][max(start - offset, 0):stop - offset])
+        return {field: np.concatenate(values) if values else np.zeros(0) for field, values in parts.items()}
+
+def decode_targets(actions, indices, size):
+    """
+    Objetivos one-hot (N, size) izquierdo y derecho a partir de pares
+    (acción 0=left/1=right, índice plano fila * COLS + columna)
+    """
+    count = len(actions)
+    left_targets = np.zeros((count, size), dtype=np.float32)
+    right_targets = np.zeros((count, size), dtype=np.float32)
+    is_left = np.asarray(actions) == 0
+    indices = np.asarray(indices, dtype=np.intp)
+    left_targets[np.flatnonzero(is_left), indices[is_left]] = 1.0
+    right_targets[np.flatnonzero(~is_left), indices[~is_left]] = 1.0
+    return left_targets, right_targets
+
+def soft_targets(label_counts, labels, counts, size):
+    """
+    Objetivos (N, size) izquierdo y derecho de muestras sin repetidos: cada
+    fila reparte 1.0 entre sus etiquetas (acción * size + índice) según
+    cuántas veces se jugó cada una. label_counts (N,) dice cuántas etiquetas
+    de `labels` / `counts` son de cada fila.
+    """
+    rows = np.repeat(np.arange(len(label_counts)), label_counts)
+    targets = np.zeros((len(label_counts), 2 * size), dtype=np.float32)
+    targets[rows, labels.astype(np.intp)] = counts
+    targets /= np.maximum(targets.sum(axis=1, keepdims=True), 1.0)
+    return targets[:, :size], targets[:, size:]
+
+def to_model_batch(fields):
+    """
+    Campos de un lote -> (X, [objetivos izquierdo, derecho]) en float32 como
+    espera el modelo. Acepta muestras compactas (codes, actions, indices) u
+    objetivos ya formados (codes, left_targets, right_targets). Las muestras
+    se toman siempre con la partida en juego, así que el canal 5 vale 1.
+    """
+    codes = fields['codes']
+    states = codes_to_state(codes, 1.0)
+    if 'left_targets' in fields:
+        return states, [fields['left_targets'], fields['right_targets']]
+    return states, list(decode_targets(fields['actions'], fields['indices'], codes.shape[-2] * codes.shape[-1]))
+
+def deduplicate(codes, actions, indices, weights=None):
+    """
+    Agrupa muestras con el mismo estado salvo simetrías del tablero.
+
+    Cada estado único se guarda una vez, en la orientación de su primera
+    aparición, y las jugadas de todas sus apariciones (llevadas a esa
+    orientación) se cuentan como etiquetas (acción * ROWS*COLS + índice).
+    Con weights cada muestra cuenta tantas veces como indique (filas ya
+    agrupadas antes, ver dedup_dataset).
+
+    Returns:
+        states: dict con 'codes' (M, ROWS, COLS), 'label_start' y 'label_count' (M,)
+        labels: dict con 'labels' (L,) y 'counts' (L,), ordenadas por estado
+    """
+    codes = np.asarray(codes, dtype=np.uint8)
+    count, rows, cols = codes.shape
+    size = rows * cols
+
+    canonical, symmetry = canonicalize(codes)
+    keys = np.ascontiguousarray(canonical.reshape(count, size)).view(np.dtype((np.void, size))).ravel()
+    _, first, state_ids = np.unique(keys, return_index=True, return_inverse=True)
+    state_ids = state_ids.ravel()
+
+    # Casilla jugada -> forma canónica -> orientación del representante
+    maps = index_maps(rows, cols)
+    canonical_index = maps[symmetry, np.asarray(indices, dtype=np.intp)]
+    index = gather_maps(rows, cols)[symmetry[first][state_ids], canonical_index]
+    labels = np.asarray(actions, dtype=np.int64) * size + index
+
+    if weights is None:
+        label_keys, counts = np.unique(state_ids.astype(np.int64) * 2 * size + labels, return_counts=True)
+    else:
+        label_keys, label_ids = np.unique(state_ids.astype(np.int64) * 2 * size + labels, return_inverse=True)
+        counts = np.bincount(label_ids.ravel(), weights=weights, minlength=len(label_keys))
+    label_states, labels = np.divmod(label_keys, 2 * size)
+    label_count = np.bincount(label_states, minlength=len(first))
+
+    states = {
+        'codes': codes[first],
+        'label_start': (np.cumsum(label_count) - label_count).astype(np.uint64),
+        'label_count': label_count.astype(np.uint32)
+    }
+    return states, {'labels': labels.astype(np.uint16), 'counts': counts.astype(np.uint32)}
+
+def _bucket_ids(codes, buckets):
+    """
+    Cubo de cada muestra según un hash de su forma canónica: los estados
+    iguales salvo simetrías caen siempre en el mismo cubo.
+    """
+    canonical, _ = canonicalize(codes)
+    flat = canonical.reshape(len(codes), -1).astype(np.uint64)
+    weights = np.random.default_rng(0).integers(1, 2 ** 63, size=flat.shape[1], dtype=np.uint64)
+    hashes = flat @ weights  # Se desborda módulo 2**64: solo es un hash
+    return (hashes >> np.uint64(32)) % np.uint64(buckets)
+
+def dedup_dataset(source_dirs, directory, bucket_size=DEDUP_BUCKET_SIZE):
+    """
+    Escribe en `directory` las muestras de los datasets de origen sin estados
+    repetidos (ver deduplicate). Reemplaza lo que hubiera en `directory`.
+
+    Funciona en dos pasadas para no cargar nunca el dataset entero: primero
+    agrupa cada fragmento de origen por separado y reparte sus filas
+    (estado, jugada, repeticiones) en cubos en disco según el hash de la
+    forma canónica; después junta los cubos uno a uno sumando repeticiones.
+    Un estado que sale en todas las partidas (el tablero sin abrir) ocupa
+    una fila por fragmento y jugada distinta, no una por aparición, así que
+    cada cubo crece con los estados únicos y no con el tamaño del dataset.
+    En memoria hay como mucho un fragmento de origen o un cubo junto con
+    las 8 simetrías de canonicalize.
+
+    Returns:
+        (muestras leídas, estados únicos)
+    """
+    import shutil
+
+    sources = [ShardedDataset(source_dir) for source_dir in source_dirs if read_manifest(source_dir) is not None]
+    samples = sum(len(source) for source in sources)
+    if samples == 0:
+        return 0, 0
+
+    buckets = -(-samples // bucket_size)
+    bucket_root = directory.rstrip(os.sep) + "_buckets"
+    for path in (directory, bucket_root):
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+
+    try:
+        # Pasada 1: cada fragmento sin repetidos, repartido por cubos
+        writers = [ShardWriter(os.path.join(bucket_root, f"bucket_{bucket:04d}")) for bucket in range(buckets)]
+        for source in sources:
+            for shard in source.iter_shards():
+                codes = shard['codes']
+                states, labels = deduplicate(codes, shard['actions'], shard['indices'])
+                rows = np.repeat(np.arange(len(states['codes'])), states['label_count'])
+                actions, indices = np.divmod(labels['labels'], codes.shape[1] * codes.shape[2])
+                bucket_ids = _bucket_ids(states['codes'], buckets)[rows]
+                for bucket in np.unique(bucket_ids):
+                    picked = bucket_ids == bucket
+                    writers[bucket].append(codes=states['codes'][rows[picked]],
+                                           actions=actions[picked].astype(np.uint8),
+                                           indices=indices[picked].astype(np.uint16),
+                                           weights=labels['counts'][picked])
+
+        # Pasada 2: juntar cada cubo (dentro de un cubo se conserva el orden
+        # de origen, así que sigue ganando la orientación de la primera aparición)
+        state_writer = ShardWriter(directory)
+        label_writer = ShardWriter(os.path.join(directory, LABELS_DIR))
+        for writer in writers:
+            if writer.sample_count == 0:
+                continue
+            bucket = ShardedDataset(writer.directory)
+            fields = bucket.read_range(0, len(bucket))
+            states, labels = deduplicate(fields['codes'], fields['actions'], fields['indices'], fields['weights'])
+            states['label_start'] += np.uint64(label_writer.sample_count)
+            state_writer.append(**states)
+            label_writer.append(**labels)
+    finally:
+        shutil.rmtree(bucket_root, ignore_errors=True)
+
+    return samples, state_writer.sample_count
+
+class MemmapLoader:
+    """
+    Lotes de entrenamiento leídos de fragmentos mapeados en memoria.
+
+    El dataset nunca se copia entero: se baraja por bloques de índices
+    contiguos (lecturas secuenciales del disco) y, dentro de una ventana de
+    `shuffle_blocks` bloques, por muestras. En memoria solo hay una ventana.
+    """
+    def __init__(self, datasets, batch_size=64, block_size=256, shuffle_blocks=16,
+                 shuffle=True, seed=None, blocks=None, augment=False):
+        if isinstance(datasets, ShardedDataset):
+            datasets = [datasets]
+        self.datasets = datasets
+        self.batch_size = batch_size
+        self.block_size = block_size
+        self.shuffle_blocks = shuffle_blocks
+        self.shuffle = shuffle
+        self.augment = augment  # Simetría al azar por muestra en cada lote (ver ai/symmetry.py)
+        self.rng = np.random.default_rng(seed)
+        # Sin datasets agrupados las muestras viajan compactas hasta tf.data y
+        # los objetivos one-hot se forman en el map paralelo. Un estado agrupado
+        # tiene un número variable de etiquetas con pesos, que no cabe en un
+        # tensor de forma fija: sus objetivos repartidos se forman aquí
+        self.compact = all(dataset.labels is None for dataset in datasets)
+        if self.compact:
+            self.fields = ('codes', 'actions', 'indices')
+        else:
+            self.fields = ('codes', 'left_targets', 'right_targets')
+
+        # Fragmentos abiertos una sola vez como memmap, con su dataset
+        self.shards = [(dataset, dataset.load_shard(index, mmap_mode='r'))
+                       for dataset in datasets for index in range(len(dataset.shards))]
+
+        # Bloque = (fragmento, inicio, fin)
+        if blocks is None:
+            counts = [shard['count'] for dataset in datasets for shard in dataset.shards]
+            blocks = [(shard, start, min(start + block_size, count))
+                      for shard, count in enumerate(counts)
+                      for start in range(0, count, block_size)]
+        self.blocks = blocks
+        self.sample_count = sum(stop - start for _, start, stop in blocks)
+
+    def split(self, validation_split, seed=None):
+        """Separa bloques al azar para validación; devuelve (entrenamiento, validación)"""
+        order = np.random.default_rng(seed).permutation(len(self.blocks))
+        val_count = int(round(len(self.blocks) * validation_split))
+        if validation_split > 0:
+            val_count = min(max(val_count, 1), len(self.blocks) - 1)
+        val_blocks = [self.blocks[i] for i in sorted(order[:val_count])]
+        train_blocks = [self.blocks[i] for i in sorted(order[val_count:])]
+        return (self._with_blocks(train_blocks, self.shuffle, self.augment),
+                self._with_blocks(val_blocks, False, False))
+
+    def _with_blocks(self, blocks, shuffle, augment):
+        return MemmapLoader(self.datasets, self.batch_size, self.block_size, self.shuffle_blocks,
+                            shuffle=shuffle, seed=self.rng.integers(2 ** 63), blocks=blocks,
+                            augment=augment)
+
+    def __len__(self):
+        """Lotes por época (el último puede ser incompleto)"""
+        return -(-self.sample_count // self.batch_size)
+
+    def _read_block(self, block):
+        """Campos de un bloque: compactos, o códigos y objetivos (one-hot o repartidos) si hay datasets agrupados"""
+        shard, start, stop = block
+        dataset, arrays = self.shards[shard]
+        codes = np.asarray(arrays['codes'][start:stop])
+        if self.compact:
+            return {'codes': codes, 'actions': np.asarray(arrays['actions'][start:stop]),
+                    'indices': np.asarray(arrays['indices'][start:stop])}
+        size = codes.shape[-2] * codes.shape[-1]
+
+        labels = dataset.labels
+        if labels is None:
+            left_targets, right_targets = decode_targets(arrays['actions'][start:stop],
+                                                         arrays['indices'][start:stop], size)
+        else:
+            # Las etiquetas de un bloque de estados consecutivos también son consecutivas
+            label_start = int(arrays['label_start'][start])
+            label_count = np.asarray(arrays['label_count'][start:stop])
+            block_labels = labels.read_range(label_start, label_start + int(label_count.sum()))
+            left_targets, right_targets = soft_targets(label_count, block_labels['labels'],
+                                                       block_labels['counts'], size)
+        return {'codes': codes, 'left_targets': left_targets, 'right_targets': right_targets}
+
+    def compact_batches(self, augment=None):
+        """
+        Recorre el dataset una vez en lotes sin decodificar (los campos de
+        self.fields). augment=None usa el valor del loader.
+        """
+        augment = self.augment if augment is None else augment
+        for fields in self._window_batches():
+            if augment and self.compact:
+                fields['codes'], fields['indices'] = augment_samples(fields['codes'], fields['indices'], self.rng)
+            elif augment:
+                fields = dict(zip(self.fields, augment_batch(*(fields[field] for field in self.fields), self.rng)))
+            yield fields
+
+    def _window_batches(self):
+        order = self.rng.permutation(len(self.blocks)) if self.shuffle else np.arange(len(self.blocks))
+        leftover = None
+
+        for window_start in range(0, len(order), self.shuffle_blocks):
+            window = [leftover] if leftover is not None else []
+            window += [self._read_block(self.blocks[i]) for i in order[window_start:window_start + self.shuffle_blocks]]
+            fields = {field: np.concatenate([block[field] for block in window]) for field in self.fields}
+            count = len(fields[self.fields[0]])
+            if self.shuffle:
+                permutation = self.rng.permutation(count)
+                fields = {field: values[permutation] for field, values in fields.items()}
+
+            full = count - count % self.batch_size
+            for start in range(0, full, self.batch_size):
+                yield {field: values[start:start + self.batch_size] for field, values in fields.items()}
+            leftover = {field: values[full:] for field, values in fields.items()} if full < count else None
+
+        if leftover is not None:
+            yield leftover
+
+    def epoch(self):
+        """Recorre el dataset una vez en lotes (X, [izquierdo, derecho])"""
+        for fields in self.compact_batches():
+            yield to_model_batch(fields)
+
+    def to_tf_dataset(self, cache=None, shuffle_buffer=None):
+        """
+        Pipeline tf.data: lotes compactos leídos del disco, decodificados a
+        float32 con map en paralelo y prefetch para solapar lectura y
+        entrenamiento. Cada pasada es una época nueva. Con muestras compactas
+        el map forma también los objetivos one-hot; con datasets agrupados
+        llegan ya repartidos (ver __init__).
+
+        Args:
+            cache: None (sin caché), True (en memoria) o ruta de archivo; con
+                caché el barajado por muestras lo hace tf.data
+            shuffle_buffer: muestras del buffer de barajado con caché
+                (por defecto, una ventana de bloques)
+        """
+        import tensorflow as tf
+
+        rows, cols = self.shards[0][1]['codes'].shape[1:]
+        size = rows * cols
+        if self.compact:
+            signature = (
+                tf.TensorSpec((None, rows, cols), tf.uint8),
+                tf.TensorSpec((None,), tf.uint8),
+                tf.TensorSpec((None,), tf.uint16),
+            )
+            decode = lambda codes, actions, indices: _tf_decode_compact(codes, actions, indices, size)
+        else:
+            signature = (
+                tf.TensorSpec((None, rows, cols), tf.uint8),
+                tf.TensorSpec((None, size), tf.float32),
+                tf.TensorSpec((None, size), tf.float32),
+            )
+            decode = _tf_decode
+        # Con caché la simetría al azar se aplica después, para no congelarla
+        dataset = tf.data.Dataset.from_generator(
+            lambda: (tuple(batch[field] for field in self.fields)
+                     for batch in self.compact_batches(augment=self.augment and not cache)),
+            output_signature=signature
+        )
+        dataset = dataset.map(decode, num_parallel_calls=tf.data.AUTOTUNE)
+
+        if cache:
+            dataset = dataset.unbatch().cache('' if cache is True else cache)
+            if self.shuffle:
+                buffer = shuffle_buffer or self.block_size * self.shuffle_blocks
+                dataset = dataset.shuffle(buffer, seed=int(self.rng.integers(2 ** 31)))
+            dataset = dataset.batch(self.batch_size)
+            if self.augment:
+                gather = tf.constant(gather_maps(rows, cols), dtype=tf.int32)
+                dataset = dataset.map(lambda state, targets: _tf_augment(state, targets, gather),
+                                      num_parallel_calls=tf.data.AUTOTUNE)
+
+        return dataset.prefetch(tf.data.AUTOTUNE)
+
+def _tf_state(codes):
+    """Versión TensorFlow de codes_to_state (partida en juego)"""
+    import tensorflow as tf
+
+    codes = tf.cast(codes, tf.int32)
+    is_number = (codes >= 1) & (codes <= 8)
+    number_value = tf.where(is_number, tf.cast(codes, tf.float32) / 8.0, 0.0)
+    channels = [codes == CODE_HIDDEN, codes == CODE_FLAG, is_number, codes == 0]
+    return tf.stack([tf.cast(channel, tf.float32) for channel in channels]
+                    + [number_value, tf.ones_like(number_value)], axis=-1)
+
+def _tf_decode(codes, left_targets, right_targets):
+    """Lote con objetivos ya formados -> (estado, objetivos) para tf.data.map"""
+    return _tf_state(codes), (left_targets, right_targets)
+
+def _tf_decode_compact(codes, actions, indices, size):
+    """Versión TensorFlow de to_model_batch con muestras compactas (decode_targets con tf.one_hot)"""
+    import tensorflow as tf
+
+    one_hot = tf.one_hot(tf.cast(indices, tf.int32), size, dtype=tf.float32)
+    is_left = tf.cast(actions == 0, tf.float32)[:, None]
+    return _tf_state(codes), (one_hot * is_left, one_hot * (1.0 - is_left))
+
+def _tf_augment(state, targets, gather):
+    """Versión TensorFlow de augment_batch sobre estados ya decodificados"""
+    import tensorflow as tf
+
+    shape = tf.shape(state)
+    count, size = shape[0], shape[1] * shape[2]
+    index = tf.gather(gather, tf.random.uniform([count], 0, tf.shape(gather)[0], dtype=tf.int32))
+    flat_state = tf.reshape(state, tf.stack([count, size, shape[3]]))
+    state = tf.reshape(tf.gather(flat_state, index, batch_dims=1), shape)
+    left_targets, right_targets = targets
+    return state, (tf.gather(left_targets, index, batch_dims=1), tf.gather(right_targets, index, batch_dims=1))
@@ -1,13 +1,18 @@
-import tensorflow as tf
+import time
 import numpy as np
 from settings import ROWS, COLS
+from utils.state_encoder import codes_to_state
 
+# TensorFlow se importa dentro de los métodos que lo usan: importar este
+# módulo (o board_to_state) no paga el arranque de TF.
 class MinesweeperModel:
     def __init__(self):
         self.model = None
         
     def create_model(self):
         """Crea el modelo de red neuronal"""
+        import tensorflow as tf
+        
         # Input: estado del tablero (ROWS, COLS, 6 features)
         input_layer = tf.keras.layers.Input(shape=(ROWS, COLS, 6))
         
@@ -49,6 +54,8 @@ class MinesweeperModel:
     
     def load_model(self, path):
         """Carga un modelo guardado"""
+        import tensorflow as tf
+        
         try:
             self.model = tf.keras.models.load_model(path)
             self.model.compile(
@@ -89,12 +96,24 @@ class MinesweeperModel:
             print(f"❌ Error en predicción: {e}")
             return None, None
     
-    def train(self, X, y, epochs=5000, batch_size=64, validation_split=0.2):
-        """Entrena el modelo"""
+    def predict_batch(self, states):
+        """
+        Predicción de un lote de estados (N, ROWS, COLS, 6) en una sola llamada
+        
+        Returns:
+            left_probs, right_probs con forma (N, ROWS, COLS)
+        """
         if self.model is None:
-            self.create_model()
+            return None, None
+        
+        left_probs, right_probs = self.model.predict_on_batch(states)
+        count = len(states)
+        return (np.asarray(left_probs).reshape(count, ROWS, COLS),
+                np.asarray(right_probs).reshape(count, ROWS, COLS))
+    
+    def _callbacks(self, sample_count=None):
+        import tensorflow as tf
         
-        # Callbacks
         callbacks = [
             tf.keras.callbacks.EarlyStopping(
                 monitor='val_loss', 
@@ -109,13 +128,94 @@ class MinesweeperModel:
             )
         ]
         
+        # Rendimiento de cada época en muestras por segundo. Solo cuenta el
+        # entrenamiento: fit valida entre on_test_begin y on_epoch_end
+        if sample_count:
+            timer = {}
+
+            def stop_timer(logs=None):
+                timer.setdefault('elapsed', time.perf_counter() - timer['start'])
+
+            def report(epoch, logs):
+                stop_timer()  # Sin validación la época acaba con el entrenamiento
+                print(f"⚡ Época {epoch + 1}: {sample_count / timer.pop('elapsed'):.0f} muestras/s")
+
+            callbacks.append(tf.keras.callbacks.LambdaCallback(
+                on_epoch_begin=lambda epoch, logs: timer.update(start=time.perf_counter()),
+                on_test_begin=stop_timer,
+                on_epoch_end=report
+            ))
+        
+        return callbacks
+    
+    def train(self, X, y, epochs=5000, batch_size=64, validation_split=0.2, seed=0):
+        """Entrena el modelo con arrays en memoria; la validación es una parte al azar apartada"""
+        import tensorflow as tf
+        
+        if self.model is None:
+            self.create_model()
+        
+        order = np.random.default_rng(seed).permutation(len(X))
+        val_count = int(len(X) * validation_split)
+        val_index, train_index = order[:val_count], order[val_count:]
+        
+        def make_dataset(index, shuffle):
+            dataset = tf.data.Dataset.from_tensor_slices((X[index], (y[0][index], y[1][index])))
+            if shuffle:
+                dataset = dataset.shuffle(len(index), seed=seed)
+            return dataset.batch(batch_size).prefetch(tf.data.AUTOTUNE)
+        
         # Entrenar
         history = self.model.fit(
-            X, y,
+            make_dataset(train_index, True),
+            validation_data=make_dataset(val_index, False) if val_count else None,
+            epochs=epochs,
+            callbacks=self._callbacks(len(train_index)),
+            verbose=1
+        )
+        
+        return history
+    
+    def train_from_loader(self, train_loader, val_loader, epochs=5000, cache=None):
+        """
+        Entrena con el pipeline tf.data de MemmapLoader (ver ai/dataset.py):
+        lee del disco y decodifica en paralelo sin cargar el dataset entero
+        
+        Args:
+            cache: None, True (memoria) o ruta de archivo para la caché de tf.data
+        """
+        if self.model is None:
+            self.create_model()
+        
+        val_cache = cache if cache in (None, True) else f"{cache}_val"
+        history = self.model.fit(
+            train_loader.to_tf_dataset(cache=cache),
+            validation_data=val_loader.to_tf_dataset(cache=val_cache),
             epochs=epochs,
-            batch_size=batch_size,
-            validation_split=validation_split,
-            callbacks=callbacks,
+            callbacks=self._callbacks(train_loader.sample_count),
+            verbose=1
+        )
+        
+        return history
+
+    def train_online(self, batches, steps_per_epoch, batch_size, validation_data, epochs=30):
+        """
+        Entrena con un generador de lotes sin fin (ver ai/replay.py) mientras
+        el autojuego sigue produciendo muestras
+        
+        Args:
+            validation_data: (X, [izquierdo, derecho]) apartado del autojuego
+        """
+        if self.model is None:
+            self.create_model()
+        
+        X_val, (left_val, right_val) = validation_data
+        history = self.model.fit(
+            batches,
+            steps_per_epoch=steps_per_epoch,
+            validation_data=(X_val, (left_val, right_val)),
+            epochs=epochs,
+            callbacks=self._callbacks(steps_per_epoch * batch_size),
             verbose=1
         )
         
@@ -123,41 +223,16 @@ class MinesweeperModel:
 
 def board_to_state(screen, analyzer):
     """Convierte el estado del tablero a array numpy para la IA"""
-    state = np.zeros((ROWS, COLS, 6), dtype=np.float32)
-    
     # Analizar estado de la carita (juego activo/inactivo)
     face_state, _, _ = analyzer.analyze_face_state(screen)
     game_active = 1.0 if "Sonriendo" in face_state else 0.0
     
-    for row in range(ROWS):  # filas (y)
-        for col in range(COLS):  # columnas (x)
-            tile_type, _, _ = analyzer.analyze_tile(screen, col, row)
-            
-            # Features por casilla:
-            # 0: Sin revelar (1.0) o revelada (0.0)
-            # 1: Tiene bandera (1.0) o no (0.0)
-            # 2: Es número (1.0) o no (0.0)
-            # 3: Es espacio vacío (1.0) o no (0.0)
-            # 4: Valor del número (0.0-1.0, normalizado)
-            # 5: Estado del juego (1.0 activo, 0.0 inactivo)
-            
-            features = np.zeros(6, dtype=np.float32)
-            
-            if tile_type == "Sin revelar":
-                features[0] = 1.0
-            elif tile_type == "Bandera":
-                features[1] = 1.0
-            elif "Número" in tile_type:
-                features[2] = 1.0
-                try:
-                    number = int(tile_type.split()[-1])
-                    features[4] = float(number) / 8.0  # Normalizar 1-8 -> 0.125-1.0
-                except:
-                    features[4] = 0.0
-            elif tile_type == "Espacio vacío":
-                features[3] = 1.0
-            
-            features[5] = game_active
-            state[row, col] = features
-    
-    return state
\ No newline at end of file
+    # Features por casilla:
+    # 0: Sin revelar (1.0) o revelada (0.0)
+    # 1: Tiene bandera (1.0) o no (0.0)
+    # 2: Es número (1.0) o no (0.0)
+    # 3: Es espacio vacío (1.0) o no (0.0)
+    # 4: Valor del número (0.0-1.0, normalizado)
+    # 5: Estado del juego (1.0 activo, 0.0 inactivo)
+    codes = analyzer.analyze_board(screen)
+    return codes_to_state(codes, game_active)
\ No newline at end of file
@@ -0,0 +1,173 @@
+#replay.py
+# Entrenamiento en línea: los procesos de autojuego llenan un buffer de
+# repetición acotado mientras el modelo entrena con lotes sacados de él, de
+# modo que generar y entrenar se solapan en lugar de ir uno detrás de otro.
+import queue
+import threading
+import numpy as np
+from settings import ROWS, COLS
+from ai.dataset import decode_targets, to_model_batch
+from ai.symmetry import augment_batch
+
+EVICTION_POLICIES = ('fifo', 'random')
+
+class ReplayBuffer:
+    """
+    Muestras compactas (códigos, acción, índice) en arrays de tamaño fijo.
+
+    Lleno, cada muestra nueva sustituye a la más antigua (eviction='fifo')
+    o a una al azar (eviction='random', los datos viejos duran más).
+    """
+    def __init__(self, capacity, rows=ROWS, cols=COLS, eviction='fifo', seed=None):
+        if eviction not in EVICTION_POLICIES:
+            raise ValueError(f"Política de expulsión inválida: {eviction} (opciones: {', '.join(EVICTION_POLICIES)})")
+        self.capacity = capacity
+        self.eviction = eviction
+        self.rng = np.random.default_rng(seed)
+
+        self.codes = np.zeros((capacity, rows, cols), dtype=np.uint8)
+        self.actions = np.zeros(capacity, dtype=np.uint8)
+        self.indices = np.zeros(capacity, dtype=np.uint16)
+        self.size = 0
+        self.oldest = 0    # Siguiente posición a sustituir con 'fifo'
+        self.added = 0     # Muestras recibidas en total
+
+    def __len__(self):
+        return self.size
+
+    def add(self, codes, actions, indices):
+        """Añade un bloque de muestras (actions: 0=left, 1=right; indices: fila * COLS + columna)"""
+        count = len(actions)
+        self.added += count
+        if count > self.capacity:
+            codes, actions, indices = codes[-self.capacity:], actions[-self.capacity:], indices[-self.capacity:]
+            count = self.capacity
+
+        # Primero los huecos libres; después, según la política de expulsión
+        free = min(self.capacity - self.size, count)
+        slots = np.arange(self.size, self.size + free)
+        evicted = count - free
+        if evicted:
+            if self.eviction == 'fifo':
+                replaced = (self.oldest + np.arange(evicted)) % self.capacity
+                self.oldest = (self.oldest + evicted) % self.capacity
+            else:
+                # Solo entre las ocupadas antes de esta llamada: los huecos
+                # libres que se acaban de asignar no se pueden pisar
+                replaced = self.rng.choice(self.size, size=evicted, replace=False)
+            slots = np.concatenate([slots, replaced])
+        self.size += free
+
+        self.codes[slots] = codes
+        self.actions[slots] = actions
+        self.indices[slots] = indices
+
+    def sample(self, batch_size):
+        """Lote al azar (con reemplazo) de campos compactos"""
+        picked = self.rng.integers(self.size, size=batch_size)
+        return {'codes': self.codes[picked], 'actions': self.actions[picked], 'indices': self.indices[picked]}
+
+class SelfPlayProducer:
+    """
+    Hilo que recorre generate_rule_shards (las partidas se juegan en otros
+    procesos) y deja cada lote de muestras en una cola acotada. Si el
+    entrenamiento va por detrás, la cola se llena y la generación espera.
+    """
+    def __init__(self, num_samples, workers=None, seed=0, queue_size=4):
+        self.num_samples = num_samples
+        self.workers = workers
+        self.seed = seed
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.stopped = threading.Event()
+        self.error = None
+        self.produced = 0
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def _run(self):
+        from ai.self_play import generate_rule_shards
+
+        try:
+            for shard in generate_rule_shards(self.num_samples, workers=self.workers, seed=self.seed):
+                count = min(len(shard['actions']), self.num_samples - self.produced)
+                shard = {
+                    'codes': shard['codes'][:count],
+                    'actions': shard['actions'][:count].astype(np.uint8),
+                    'indices': (shard['rows'][:count] * COLS + shard['cols'][:count]).astype(np.uint16)
+                }
+                if not self._put(shard):
+                    return
+                self.produced += count
+        except Exception as e:
+            self.error = e
+        finally:
+            self._put(None)  # Fin de la generación
+
+    def _put(self, item):
+        """Espera sitio en la cola (contrapresión) salvo que se pida parar"""
+        while not self.stopped.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def get(self, block=True):
+        """Siguiente lote de muestras, None al terminar o sin espera si no hay ninguno listo"""
+        try:
+            item = self.queue.get(block=block)
+        except queue.Empty:
+            return None, False
+        if item is None and self.error is not None:
+            raise self.error
+        return item, True
+
+    def stop(self):
+        """Detiene la generación (cierra los procesos al salir del generador)"""
+        self.stopped.set()
+        self.thread.join()
+
+def replay_batches(producer, buffer, batch_size=64, replay_ratio=4.0, min_samples=1000,
+                   augment=True, rng=None):
+    """
+    Lotes (X, [izquierdo, derecho]) sacados del buffer mientras el productor
+    lo sigue llenando; no termina nunca (Keras lo limita con steps_per_epoch).
+
+    Args:
+        replay_ratio: muestras de entrenamiento por muestra generada; si el
+            entrenamiento lo alcanza, espera a que llegue más autojuego
+        min_samples: muestras en el buffer antes del primer lote
+        augment: aplicar una simetría al azar a cada muestra
+    """
+    rng = np.random.default_rng(rng)
+    size = buffer.codes.shape[1] * buffer.codes.shape[2]
+    trained = 0
+    finished = False
+
+    while True:
+        # Recoger lo que haya llegado; esperar solo si el ritmo lo exige
+        while not finished:
+            must_wait = (len(buffer) < min(min_samples, producer.num_samples)
+                         or trained + batch_size > replay_ratio * buffer.added)
+            shard, received = producer.get(block=must_wait)
+            if not received:
+                break
+            if shard is None:
+                finished = True
+            else:
+                buffer.add(shard['codes'], shard['actions'], shard['indices'])
+
+        if len(buffer) == 0:
+            raise RuntimeError("El autojuego terminó sin generar muestras")
+
+        fields = buffer.sample(batch_size)
+        left_targets, right_targets = decode_targets(fields['actions'], fields['indices'], size)
+        codes = fields['codes']
+        if augment:
+            codes, left_targets, right_targets = augment_batch(codes, left_targets, right_targets, rng)
+        trained += batch_size
+        yield to_model_batch({'codes': codes, 'left_targets': left_targets, 'right_targets': right_targets})
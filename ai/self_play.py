@@ -0,0 +1,110 @@
+import os
+import random
+import numpy as np
+from settings import ROWS, COLS
+from game.env import MinesweeperEnv
+from agents.rules_agent import RulesAgent
+from utils.state_encoder import board_to_codes
+
+# Este módulo no importa pygame: lo cargan los procesos de generación
+
+ACTION_TYPES = ('left', 'right')
+
+def play_rule_game(env, agent):
+    """
+    Juega una partida sin pantalla con el agente de reglas.
+
+    El agente devuelve todas las jugadas seguras de una vez y se aplican
+    seguidas: el tablero se codifica una vez por tanda, no por jugada, y el
+    agente solo revisa las casillas que cambió la tanda anterior.
+
+    Returns:
+        Lista de (códigos, tipo_acción, fila, columna) con la rejilla de códigos
+        de casilla de la que el agente dedujo cada jugada
+    """
+    state = env.reset()
+    samples = []
+
+    done = False
+    changed = None  # Partida nueva: el agente reconstruye la frontera
+    while not done:
+        actions = agent.predict_actions(state, env.flags_remaining, changed=changed)
+        if not actions:
+            break
+
+        codes = board_to_codes(env.engine)
+        state, done, info, changed = env.step_batch(actions)
+        samples.extend((codes, action_type, row, col) for action_type, row, col in info['played'])
+
+    return samples
+
+def generate_shard(seed, shard_index, games, max_moves=200):
+    """
+    Juega `games` partidas con semillas derivadas de (seed, shard_index).
+
+    El resultado solo depende de esos dos valores, no del proceso que lo ejecute.
+
+    Returns:
+        dict con 'codes' (N, ROWS, COLS) uint8, 'actions' (N,) 0=left/1=right,
+        'rows' y 'cols' (N,), y 'games'
+    """
+    seed_sequence = np.random.SeedSequence([seed, shard_index])
+    board_seed, agent_seed = seed_sequence.spawn(2)
+    env = MinesweeperEnv(seed=board_seed, max_moves=max_moves)
+    agent = RulesAgent(rng=random.Random(int(agent_seed.generate_state(1)[0])), amount_mines=env.amount_mines)
+
+    samples = []
+    for _ in range(games):
+        samples.extend(play_rule_game(env, agent))
+
+    if not samples:
+        empty = np.zeros(0, dtype=np.int32)
+        return {'codes': np.zeros((0, ROWS, COLS), dtype=np.uint8), 'actions': empty,
+                'rows': empty, 'cols': empty, 'games': games}
+
+    codes, action_types, rows, cols = zip(*samples)
+    return {
+        'codes': np.stack(codes),
+        'actions': np.array([ACTION_TYPES.index(a) for a in action_types], dtype=np.int32),
+        'rows': np.array(rows, dtype=np.int32),
+        'cols': np.array(cols, dtype=np.int32),
+        'games': games,
+    }
+
+def _generate_shard_task(args):
+    return generate_shard(*args)
+
+def generate_rule_shards(num_samples, workers=None, seed=0, games_per_shard=50, max_moves=200):
+    """
+    Genera muestras con el agente de reglas repartiendo partidas entre procesos.
+
+    Los lotes de partidas (shards) se lanzan por rondas y se recogen en orden,
+    así que el resultado es el mismo con cualquier número de procesos.
+
+    Yields:
+        Cada shard (ver generate_shard) en orden, hasta sumar num_samples muestras
+    """
+    workers = workers or os.cpu_count() or 1
+    samples = 0
+    shard_index = 0
+
+    if workers == 1:
+        while samples < num_samples:
+            shard = generate_shard(seed, shard_index, games_per_shard, max_moves)
+            shard_index += 1
+            samples += len(shard['actions'])
+            yield shard
+        return
+
+    import multiprocessing
+    # 'spawn': procesos limpios que no heredan pygame ni la ventana del padre
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(workers) as pool:
+        while samples < num_samples:
+            tasks = [(seed, shard_index + i, games_per_shard, max_moves) for i in range(workers * 2)]
+            shard_index += len(tasks)
+            for shard in pool.imap(_generate_shard_task, tasks):
+                if samples >= num_samples:
+                    break
+                samples += len(shard['actions'])
+                yield shard
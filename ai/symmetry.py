@@ -0,0 +1,95 @@
+#symmetry.py
+# Simetrías del tablero. El buscaminas no cambia al girar o reflejar el
+# tablero: hay 8 simetrías si es cuadrado y 4 (sin trasponer) si no lo es.
+# La simetría k se aplica como: trasponer si k & 4, invertir filas si k & 1,
+# invertir columnas si k & 2.
+from functools import lru_cache
+import numpy as np
+
+def symmetry_count(rows, cols):
+    return 8 if rows == cols else 4
+
+def transform(grids, k, axes=(-2, -1)):
+    """Aplica la simetría k a los ejes (filas, columnas) indicados de grids (devuelve una vista)"""
+    row_axis, col_axis = axes
+    if k & 4:
+        grids = np.swapaxes(grids, row_axis, col_axis)
+    if k & 1:
+        grids = np.flip(grids, row_axis)
+    if k & 2:
+        grids = np.flip(grids, col_axis)
+    return grids
+
+@lru_cache(maxsize=None)
+def index_maps(rows, cols):
+    """
+    maps[k, i] = índice plano al que la simetría k lleva la casilla i
+    (una fila por simetría). Se comparte entre llamadas: no modificar.
+    """
+    grid = np.arange(rows * cols).reshape(rows, cols)
+    maps = np.empty((symmetry_count(rows, cols), rows * cols), dtype=np.intp)
+    for k in range(len(maps)):
+        moved = transform(grid, k).ravel()  # moved[nuevo] = antiguo
+        maps[k, moved] = np.arange(rows * cols)
+    return maps
+
+@lru_cache(maxsize=None)
+def gather_maps(rows, cols):
+    """gather[k, nuevo] = casilla de origen: transform(g, k).ravel() == g.ravel()[gather[k]]"""
+    return np.argsort(index_maps(rows, cols), axis=1)
+
+def augment_batch(codes, left_targets, right_targets, rng):
+    """
+    Aplica a cada muestra de un lote una simetría al azar, la misma al
+    estado (N, ROWS, COLS) y a sus objetivos (N, ROWS*COLS), con un único
+    gather por array.
+    """
+    count, rows, cols = codes.shape
+    gather = gather_maps(rows, cols)
+    gather = gather[rng.integers(len(gather), size=count)]
+    codes = np.take_along_axis(codes.reshape(count, -1), gather, axis=1).reshape(codes.shape)
+    return (codes,
+            np.take_along_axis(left_targets, gather, axis=1),
+            np.take_along_axis(right_targets, gather, axis=1))
+
+def augment_samples(codes, indices, rng):
+    """
+    Como augment_batch para muestras compactas: gira/refleja cada estado
+    (N, ROWS, COLS) y lleva su casilla jugada (índice plano) a la nueva posición.
+    """
+    count, rows, cols = codes.shape
+    symmetry = rng.integers(symmetry_count(rows, cols), size=count)
+    gather = gather_maps(rows, cols)[symmetry]
+    codes = np.take_along_axis(codes.reshape(count, -1), gather, axis=1).reshape(codes.shape)
+    indices = index_maps(rows, cols)[symmetry, np.asarray(indices, dtype=np.intp)]
+    return codes, indices.astype(np.uint16)
+
+def canonicalize(codes):
+    """
+    Forma canónica de cada rejilla de códigos (N, ROWS, COLS): la menor en
+    orden lexicográfico entre todas sus simetrías.
+
+    Returns:
+        canonical (N, ROWS, COLS) y symmetry (N,) con
+        canonical[i] == transform(codes[i], symmetry[i])
+    """
+    codes = np.asarray(codes, dtype=np.uint8)
+    count, rows, cols = codes.shape
+    size = rows * cols
+    words = -(-size // 8)
+
+    # Cada simetría como palabras de 64 bits big-endian: comparar palabras
+    # en orden equivale a comparar los bytes en orden lexicográfico
+    candidates = np.zeros((symmetry_count(rows, cols), count, words * 8), dtype=np.uint8)
+    for k in range(len(candidates)):
+        candidates[k, :, :size] = transform(codes, k).reshape(count, size)
+    keys = candidates.view('>u8').astype(np.uint64)
+
+    alive = np.ones(candidates.shape[:2], dtype=bool)
+    for word in range(words):
+        values = np.where(alive, keys[..., word], np.iinfo(np.uint64).max)
+        alive &= values == values.min(axis=0)
+    symmetry = np.argmax(alive, axis=0)
+
+    canonical = candidates[symmetry, np.arange(count), :size].reshape(count, rows, cols)
+    return canonical, symmetry
@@ -1,7 +1,14 @@
 import os
+import shutil
 import numpy as np
 from ai.model import MinesweeperModel
-from ai.data_collector import DataCollector
+from ai.data_collector import DataCollector, DATA_DIR
+from ai.dataset import ShardedDataset, MemmapLoader, read_manifest, dedup_dataset
+
+# Datasets temporales que se regeneran en cada entrenamiento: partidas del
+# agente de reglas y la unión de todas las fuentes sin estados repetidos
+RULE_DATA_DIR = "data/rule_data"
+DEDUP_DATA_DIR = "data/dedup_data"
 
 class MinesweeperTrainer:
     def __init__(self, model_path="models/minesweeper_model.h5"):
@@ -12,16 +19,19 @@ class MinesweeperTrainer:
         # Crear directorio de modelos
         os.makedirs(os.path.dirname(model_path), exist_ok=True)
     
-    def train_from_rules(self, num_samples=5000, epochs=30):
+    def train_from_rules(self, num_samples=5000, epochs=30, workers=None):
         """
         Entrenamiento automático usando solo reglas lógicas
+        
+        Args:
+            workers: procesos para generar partidas (por defecto, todos los núcleos)
         """
         print("🤖 Entrenamiento automático con reglas")
         print("=" * 50)
         
         # Generar datos con reglas
         print("1️⃣ Generando datos de entrenamiento...")
-        samples = self.data_collector.generate_rule_based_data(num_samples)
+        samples = self._generate_rule_dataset(num_samples, workers)
         
         if samples < 100:
             print("❌ No se generaron suficientes datos")
@@ -29,66 +39,155 @@ class MinesweeperTrainer:
         
         # Entrenar modelo
         print("2️⃣ Entrenando modelo...")
-        return self._train_model(epochs=epochs)
+        return self._train_model([RULE_DATA_DIR], epochs=epochs)
     
-    def train_from_saved_data(self, data_path="data/training_data.pkl", epochs=50):
+    def train_from_saved_data(self, data_path=DATA_DIR, epochs=50):
         """
         Entrenamiento usando datos guardados previamente
         """
         print("📂 Entrenamiento con datos guardados")
         print("=" * 50)
         
-        # Cargar datos
-        self.data_collector.load_data(data_path)
+        self.data_collector.migrate_legacy_data(data_path)
         
-        if self.data_collector.sample_count < 100:
+        if read_manifest(data_path) is None or len(ShardedDataset(data_path)) < 100:
             print("❌ Datos insuficientes. Necesitas al menos 100 muestras.")
             return None
         
         # Entrenar
-        return self._train_model(epochs=epochs)
+        return self._train_model([data_path], epochs=epochs)
     
-    def train_mixed(self, rule_samples=3000, manual_data_path="data/training_data.pkl", epochs=50):
+    def train_mixed(self, rule_samples=3000, manual_data_path=DATA_DIR, epochs=50, workers=None):
         """
         Entrenamiento mixto: reglas + datos manuales
         """
         print("🔄 Entrenamiento mixto")
         print("=" * 50)
         
-        # Limpiar datos previos
-        self.data_collector.clear_data()
-        
         # 1. Generar datos con reglas
         print("1️⃣ Generando datos base con reglas...")
-        rule_samples_generated = self.data_collector.generate_rule_based_data(rule_samples)
+        rule_samples_generated = self._generate_rule_dataset(rule_samples, workers)
+        data_dirs = [RULE_DATA_DIR]
         
-        # 2. Cargar datos manuales si existen
+        # 2. Añadir datos manuales si existen
         print("2️⃣ Cargando datos manuales...")
-        if os.path.exists(manual_data_path):
-            manual_collector = DataCollector()
-            manual_collector.load_data(manual_data_path)
-            
-            # Combinar datos
-            self.data_collector.states.extend(manual_collector.states)
-            self.data_collector.left_targets.extend(manual_collector.left_targets)
-            self.data_collector.right_targets.extend(manual_collector.right_targets)
-            self.data_collector.sample_count = len(self.data_collector.states)
-            
-            print(f"📊 Datos combinados: {self.data_collector.sample_count} muestras")
+        self.data_collector.migrate_legacy_data(manual_data_path)
+        if read_manifest(manual_data_path) is not None:
+            data_dirs.append(manual_data_path)
+            manual_samples = len(ShardedDataset(manual_data_path))
+            print(f"📊 Datos combinados: {rule_samples_generated + manual_samples} muestras")
         
         # 3. Entrenar
         print("3️⃣ Entrenando modelo final...")
-        return self._train_model(epochs=epochs)
+        return self._train_model(data_dirs, epochs=epochs)
     
-    def _train_model(self, epochs=30, learning_rate=0.001):
-        """Entrena el modelo con los datos actuales"""
-        # Obtener dataset
-        X, y = self.data_collector.get_dataset()
+    def train_online(self, num_samples=20000, epochs=30, workers=None, batch_size=16,
+                     replay_ratio=4.0, buffer_size=20000, eviction='fifo', val_samples=1000):
+        """
+        Entrenamiento en línea: el autojuego llena un buffer de repetición
+        mientras el modelo entrena, así el tiempo total se acerca al mayor de
+        los dos en lugar de a su suma
+        
+        Args:
+            replay_ratio: veces que se usa de media cada muestra generada
+            buffer_size: capacidad del buffer de repetición
+            eviction: 'fifo' (sale la más antigua) o 'random'
+            val_samples: primeras muestras generadas que se apartan para validación
+        """
+        from ai.replay import ReplayBuffer, SelfPlayProducer, replay_batches
+        from ai.dataset import to_model_batch
+        
+        print("⚡ Entrenamiento en línea (autojuego + entrenamiento a la vez)")
+        print("=" * 50)
         
-        if X is None:
+        producer = SelfPlayProducer(num_samples + val_samples, workers=workers).start()
+        buffer = ReplayBuffer(buffer_size, eviction=eviction, seed=0)
+        
+        try:
+            # Validación fija con las primeras val_samples muestras, que no entran
+            # en el buffer; el resto del último lote ya es de entrenamiento
+            validation = {'codes': [], 'actions': [], 'indices': []}
+            collected = 0
+            while collected < val_samples:
+                shard, _ = producer.get()
+                if shard is None:
+                    break
+                take = val_samples - collected
+                for field in validation:
+                    validation[field].append(shard[field][:take])
+                if len(shard['actions']) > take:
+                    buffer.add(shard['codes'][take:], shard['actions'][take:], shard['indices'][take:])
+                collected += min(len(shard['actions']), take)
+            if collected == 0:
+                print("❌ No se generaron suficientes datos")
+                return None
+            validation = to_model_batch({field: np.concatenate(values) for field, values in validation.items()})
+            
+            steps_per_epoch = max(1, int(num_samples * replay_ratio) // (batch_size * epochs))
+            print(f"📊 {num_samples} muestras, {epochs} épocas de {steps_per_epoch} lotes "
+                  f"(repetición {replay_ratio}x, buffer {buffer_size} '{eviction}')")
+            
+            if os.path.exists(self.model_path):
+                print("📂 Cargando modelo existente...")
+                if not self.model.load_model(self.model_path):
+                    self.model.create_model()
+            else:
+                print("🔷 Creando nuevo modelo...")
+                self.model.create_model()
+            
+            batches = replay_batches(producer, buffer, batch_size=batch_size, replay_ratio=replay_ratio,
+                                     min_samples=min(buffer_size, 1000), rng=0)
+            history = self.model.train_online(batches, steps_per_epoch, batch_size, validation, epochs=epochs)
+            
+            self.model.save_model(self.model_path)
+            final_loss = history.history['val_loss'][-1] if 'val_loss' in history.history else 'N/A'
+            print(f"✅ Entrenamiento completado. Loss final: {final_loss}")
+            print(f"📊 Muestras generadas: {buffer.added} | en el buffer: {len(buffer)}")
+            return self.model
+            
+        except Exception as e:
+            print(f"❌ Error durante entrenamiento: {e}")
             return None
+        finally:
+            producer.stop()
+    
+    def _generate_rule_dataset(self, num_samples, workers):
+        """Genera partidas con reglas directamente a disco, sin acumularlas en memoria"""
+        if os.path.isdir(RULE_DATA_DIR):
+            shutil.rmtree(RULE_DATA_DIR)
+        return self.data_collector.generate_rule_based_data(num_samples, workers=workers,
+                                                            directory=RULE_DATA_DIR)
+    
+    def _train_model(self, data_dirs, epochs=30, learning_rate=0.001, dedup=True, cache=None):
+        """
+        Entrena el modelo con los datasets en disco indicados, leídos como memmap
         
-        print(f"📊 Entrenando con {len(X)} muestras por {epochs} épocas")
+        Args:
+            dedup: agrupar antes los estados repetidos (salvo simetrías) en una
+                sola muestra con objetivos repartidos entre sus jugadas
+            cache: caché del pipeline tf.data (None, True en memoria o ruta)
+        """
+        if dedup:
+            samples, unique = dedup_dataset(data_dirs, DEDUP_DATA_DIR)
+            if unique:
+                print(f"🧬 Estados únicos: {unique} de {samples} muestras")
+                data_dirs = [DEDUP_DATA_DIR]
+        
+        datasets = [ShardedDataset(data_dir) for data_dir in data_dirs if read_manifest(data_dir) is not None]
+        sample_count = sum(len(dataset) for dataset in datasets)
+        
+        if sample_count == 0:
+            print("❌ No hay datos para entrenar")
+            return None
+        
+        # Bloques pequeños en datasets pequeños para que la validación tenga varios
+        block_size = max(1, min(256, sample_count // 20))
+        # Batch pequeño para mejor convergencia; cada lote de entrenamiento va
+        # girado/reflejado al azar (8 simetrías si el tablero es cuadrado)
+        loader = MemmapLoader(datasets, batch_size=16, block_size=block_size, seed=0, augment=True)
+        train_loader, val_loader = loader.split(0.15, seed=0)
+        
+        print(f"📊 Entrenando con {sample_count} muestras por {epochs} épocas")
         
         # Crear o cargar modelo
         if os.path.exists(self.model_path):
@@ -102,12 +201,7 @@ class MinesweeperTrainer:
         
         # Entrenar
         try:
-            history = self.model.train(
-                X, y,
-                epochs=epochs,
-                batch_size=16,  # Batch pequeño para mejor convergencia
-                validation_split=0.15
-            )
+            history = self.model.train_from_loader(train_loader, val_loader, epochs=epochs, cache=cache)
             
             # Guardar modelo
             self.model.save_model(self.model_path)
@@ -136,53 +230,36 @@ class MinesweeperTrainer:
             return
         
         from agents.ai_agent import AIAgent
-        from game.game import Game
-        from ai.model import board_to_state
-        import pygame
+        from game.env import MinesweeperEnv
         
-        # Inicializar pygame
-        if not pygame.get_init():
-            pygame.init()
-            pygame.display.set_mode((400, 400))
-        
-        agent = AIAgent(model)
+        # Partidas sin pantalla: mismo camino que el autojuego
+        env = MinesweeperEnv(max_moves=200)
+        agent = AIAgent(model, verbose=False)
         wins = 0
         total_moves = 0
         
         for game_num in range(test_games):
-            game = Game()
-            moves_in_game = 0
+            state = env.reset()
+            done = False
+            won = False
             
-            while game.game_active and moves_in_game < 200:
-                state = board_to_state(game.screen, game.tile_analyzer)
-                action = agent.predict_action(state, game.flags_remaining)
-                
-                if not action:
-                    break
-                
-                action_type, row, col = action
+            changed = None
+            while not done:
+                # Todas las jugadas seguras de una vez, con acordes; el agente
+                # solo revisa las casillas que cambió la tanda anterior
+                actions = agent.predict_actions(state, env.flags_remaining, chord=True, changed=changed)
                 
-                try:
-                    if action_type == 'left':
-                        if not game.board.dig(col, row):
-                            break  # Game over
-                    elif action_type == 'right':
-                        tile = game.board.board_list[col][row]
-                        if not tile.revealed and not tile.flagged and game.flags_remaining > 0:
-                            tile.flagged = True
-                            game.flags_remaining -= 1
-                except:
+                if not actions:
                     break
                 
-                moves_in_game += 1
-                game.draw()
-                pygame.display.flip()
+                state, done, info, changed = env.step_batch(actions)
+                won = info['won']
             
-            if game.check_win():
+            if won:
                 wins += 1
             
-            total_moves += moves_in_game
-            print(f"Juego {game_num + 1}: {'Ganado' if game.check_win() else 'Perdido'} ({moves_in_game} movimientos)")
+            total_moves += env.moves
+            print(f"Juego {game_num + 1}: {'Ganado' if won else 'Perdido'} ({env.moves} movimientos)")
         
         win_rate = (wins / test_games) * 100
         avg_moves = total_moves / test_games
@@ -4,7 +4,6 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import pygame
 from game.game import Game
-from ai.model import board_to_state
 from ai.data_collector import DataCollector
 from settings import TOP_PANEL_HEIGHT, TILESIZE, ROWS, COLS, AMOUNT_MINES
 
@@ -90,7 +89,7 @@ class TrainingGame(Game):
         
         # Capturar estado ANTES del clic
         if self.collector:
-            self.last_state = board_to_state(self.screen, self.tile_analyzer)
+            self.last_state = self.state
         
         # Determinar tipo de acción basado en análisis visual
         tile_type, _, _ = self.tile_analyzer.analyze_tile(self.screen, tile_col, tile_row)
@@ -123,7 +122,7 @@ class TrainingGame(Game):
             self.elapsed_time = 0
             self.update_timer()
         
-        if not self.board.dig(col, row):
+        if not self.dig(col, row):
             # 💀 Perdiste, guardar y reiniciar
             print("💀 Juego perdido, guardando muestras...")
             if self.collector:
@@ -136,15 +135,7 @@ class TrainingGame(Game):
 
     def _execute_right_click(self, col, row):
         """Ejecuta un clic derecho validado"""
-        tile = self.board.board_list[col][row]
-        if tile.flagged:
-            tile.flagged = False
-            self.flags_remaining += 1
-        else:
-            if self.flags_remaining > 0:
-                tile.flagged = True
-                self.flags_remaining -= 1
-        self.update_flag_counter()
+        self.toggle_flag(col, row)
 
     
     def reset_game(self):
@@ -183,13 +174,15 @@ class TrainingGame(Game):
         print("=" * 40)
         
         clock = pygame.time.Clock()
+        last_progress = 0
         
         try:
             while self.games_completed < target_games:
                 self.events()
                 
-                # Mostrar progreso cada 10 partidas
-                if self.games_completed > 0 and self.games_completed % 10 == 0:
+                # Mostrar progreso cada 10 partidas (una vez por hito)
+                if self.games_completed > last_progress and self.games_completed % 10 == 0:
+                    last_progress = self.games_completed
                     remaining = target_games - self.games_completed
                     print(f"📈 Progreso: {self.games_completed}/{target_games} ({remaining} restantes)")
                     
@@ -224,8 +217,9 @@ def manual_data_collection():
     # Crear recolector
     collector = DataCollector()
     
-    # Cargar datos existentes si los hay
-    collector.load_data()
+    # Los datos existentes se quedan en disco: save_data solo añade las muestras
+    # nuevas. El pickle antiguo se convierte una vez al formato por fragmentos.
+    collector.migrate_legacy_data()
     
     # Crear juego de entrenamiento
     training_game = TrainingGame(collector)
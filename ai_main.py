@@ -1,7 +1,7 @@
 import pygame
 import os
 from game.game import Game
-from ai.model import MinesweeperModel, board_to_state
+from ai.model import MinesweeperModel
 from agents.ai_agent import AIAgent
 from settings import TILESIZE, TOP_PANEL_HEIGHT, ROWS, COLS
 
@@ -120,7 +120,7 @@ class AIGame(Game):
             self.update_timer()
         
         # Revelar casilla
-        if not self.board.dig(col, row):
+        if not self.dig(col, row):
             self.reset_game()  # Perdió
             print(f"💥 Mina en ({row},{col}) - Juego perdido")
         elif self.check_win():
@@ -136,41 +136,48 @@ class AIGame(Game):
         if tile.revealed:
             return  # No se puede marcar casilla revelada
         
-        # Alternar bandera
-        if tile.flagged:
-            # Quitar bandera
-            tile.flagged = False
-            self.flags_remaining += 1
-            print(f"🚩❌ Bandera quitada en ({row},{col})")
-        else:
-            # Colocar bandera (si hay disponibles)
-            if self.flags_remaining > 0:
-                tile.flagged = True
-                self.flags_remaining -= 1
+        # Alternar bandera (solo se coloca si hay disponibles)
+        if self.toggle_flag(col, row):
+            if tile.flagged:
                 print(f"🚩✅ Bandera colocada en ({row},{col})")
-        
-        self.update_flag_counter()
+            else:
+                print(f"🚩❌ Bandera quitada en ({row},{col})")
     
     def execute_ai_action(self):
-        """Ejecuta una acción de la IA"""
+        """Ejecuta las acciones de la IA (todas las seguras de una vez)"""
         if not self.ai_agent:
             return
         
         # Obtener estado actual
-        current_state = board_to_state(self.screen, self.tile_analyzer)
+        current_state = self.state
         
-        # Predecir acción
-        action = self.ai_agent.predict_action(current_state, self.flags_remaining)
+        # Predecir acciones
+        actions = self.ai_agent.predict_actions(current_state, self.flags_remaining, chord=True)
         
-        if action:
-            action_type, row, col = action
-            
-            print(f"🤖 IA ejecuta {action_type.upper()} en ({row},{col})")
-            
-            if action_type == 'left':
-                self.execute_left_click(col, row)
-            elif action_type == 'right':
-                self.execute_right_click(col, row)
+        if actions:
+            # La tanda se aplica con el mismo camino que el autojuego; aquí
+            # solo se actualiza la interfaz
+            _, _, info, _ = self.env.step_batch(actions)
+            for action_type, row, col in info['played']:
+                print(f"🤖 IA ejecuta {action_type.upper()} en ({row},{col})")
+
+            # Primer clic - iniciar temporizador
+            if self.first_click and any(action_type != 'right' for action_type, _, _ in info['played']):
+                self.first_click = False
+                self.timer_started = True
+                self.elapsed_time = 0
+                self.update_timer()
+
+            self.flags_remaining = self.env.flags_remaining
+            self.update_flag_counter()
+
+            if info['lost']:
+                _, row, col = info['played'][-1]
+                self.reset_game()  # Perdió
+                print(f"💥 Mina en ({row},{col}) - Juego perdido")
+            elif info['won']:
+                self.reset_game()  # Ganó
+                print("🎉 ¡Juego ganado!")
         else:
             print("🤖 IA no encuentra acción válida")
             # Desactivar IA si no puede continuar
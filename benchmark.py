@@ -0,0 +1,497 @@
+import os
+import sys
+import time
+import numpy as np
+
+# Tamaños de referencia: (filas, columnas, minas)
+BOARD_SIZES = [
+    (9, 9, 10),
+    (16, 16, 40),
+    (16, 30, 99),
+    (100, 100, 2000),
+]
+
+def _time_per_call(func, repeats):
+    """Tiempo medio por llamada en microsegundos"""
+    start = time.perf_counter()
+    for _ in range(repeats):
+        func()
+    return (time.perf_counter() - start) / repeats * 1e6
+
+def bench_generation(repeats=200, batch_size=256):
+    """Coste de generar un tablero: uno a uno y en pilas de N tableros"""
+    from game.engine import BoardEngine, compute_clues
+
+    print("🧱 Generación de tableros (µs por tablero)")
+    print(f"{'Tamaño':>12} | {'Minas':>5} | {'Tablero':>10} | {'Pistas':>10} | {'Pistas (lote)':>13}")
+    print("-" * 62)
+
+    for rows, cols, mines in BOARD_SIZES:
+        single_repeats = max(1, repeats * 81 // (rows * cols))
+        board_cost = _time_per_call(lambda: BoardEngine(rows, cols, mines), single_repeats)
+
+        engine = BoardEngine(rows, cols, mines)
+        clues_cost = _time_per_call(lambda: compute_clues(engine.mines), single_repeats)
+
+        stack = np.zeros((batch_size, rows, cols), dtype=bool)
+        stack[:, engine.mines] = True
+        batch_repeats = max(1, single_repeats // batch_size)
+        batch_cost = _time_per_call(lambda: compute_clues(stack), batch_repeats) / batch_size
+
+        print(f"{f'{cols}x{rows}':>12} | {mines:>5} | {board_cost:>10.1f} | {clues_cost:>10.1f} | {batch_cost:>13.2f}")
+
+def bench_mines(repeats=500, batch_size=256):
+    """Colocación de minas a densidades altas: un tablero vs lote de tableros"""
+    from game.engine import generate_mines
+
+    rows, cols = 16, 30
+    rng = np.random.default_rng(0)
+
+    print(f"💣 Colocación de minas en {cols}x{rows} (µs por tablero)")
+    print(f"{'Densidad':>9} | {'Minas':>5} | {'Tablero':>10} | {'Lote':>10}")
+    print("-" * 44)
+
+    for density in (0.12, 0.25, 0.35):
+        mines = int(rows * cols * density)
+        single_cost = _time_per_call(lambda: generate_mines(rows, cols, mines, rng), repeats)
+        batch_cost = _time_per_call(
+            lambda: generate_mines(rows, cols, mines, rng, count=batch_size),
+            max(1, repeats // 50)
+        ) / batch_size
+        print(f"{density:>9.0%} | {mines:>5} | {single_cost:>10.1f} | {batch_cost:>10.2f}")
+
+def bench_encoder(games=10, moves=40, seed=0):
+    """
+    Paridad y coste del codificador directo frente a la lectura de píxeles.
+
+    Juega partidas aleatorias en una ventana oculta y compara en cada jugada
+    board_to_state (píxeles) con engine_to_state (arrays del motor) y con el
+    estado incremental que mantiene el propio juego (Game.state).
+    """
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    import pygame
+    pygame.init()
+    from game.game import Game
+    from ai.model import board_to_state
+    from utils.state_encoder import engine_to_state
+
+    rng = np.random.default_rng(seed)
+    game = Game()
+    mismatches = 0
+    states = 0
+    pixel_time = 0.0
+    direct_time = 0.0
+
+    for _ in range(games):
+        game.new()
+        for _ in range(moves):
+            game.draw()
+
+            start = time.perf_counter()
+            pixel_state = board_to_state(game.screen, game.tile_analyzer)
+            pixel_time += time.perf_counter() - start
+
+            start = time.perf_counter()
+            direct_state = engine_to_state(game.board.engine, game.game_active)
+            direct_time += time.perf_counter() - start
+
+            states += 1
+            for name, state in (('directo', direct_state), ('incremental', game.state)):
+                if not np.array_equal(pixel_state, state):
+                    mismatches += 1
+                    diff_cells = np.argwhere(np.any(pixel_state != state, axis=-1))
+                    print(f"❌ Diferencia ({name}) en {len(diff_cells)} casillas, p.ej. {tuple(diff_cells[0])}")
+
+            if not game.game_active:
+                break
+
+            engine = game.board.engine
+            row, col = divmod(int(rng.integers(engine.rows * engine.cols)), engine.cols)
+            if rng.random() < 0.2:
+                game.toggle_flag(col, row)
+            elif not engine.flagged[row, col]:
+                if not game.dig(col, row):
+                    game.end_game(False)
+                elif game.check_win():
+                    game.end_game(True)
+
+    print("🔍 Codificación del estado (µs por estado)")
+    print(f"   Píxeles: {pixel_time / states * 1e6:.1f} | Directo: {direct_time / states * 1e6:.1f}")
+    if mismatches:
+        print(f"❌ Paridad: {mismatches} diferencias en {states} estados")
+    else:
+        print(f"✅ Paridad: {states} estados idénticos bit a bit")
+    return mismatches == 0
+
+def bench_analyzer(games=10, moves=40, seed=0):
+    """Análisis de pantalla: analyze_board (vectorizado) frente a analyze_tile por casilla"""
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    import pygame
+    pygame.init()
+    from game.game import Game
+    from settings import ROWS, COLS
+    from utils.state_encoder import CODE_HIDDEN, CODE_FLAG, CODE_UNKNOWN
+
+    names = {"Sin revelar": CODE_HIDDEN, "Bandera": CODE_FLAG, "Espacio vacío": 0}
+    names.update({f"Número {number}": number for number in range(1, 9)})
+
+    def per_tile_codes(screen, analyzer):
+        codes = np.full((ROWS, COLS), CODE_UNKNOWN, dtype=np.uint8)
+        for row in range(ROWS):
+            for col in range(COLS):
+                tile_type, _, _ = analyzer.analyze_tile(screen, col, row)
+                codes[row, col] = names.get(tile_type, CODE_UNKNOWN)
+        return codes
+
+    rng = np.random.default_rng(seed)
+    game = Game()
+    mismatches = 0
+    boards = 0
+    tile_time = 0.0
+    board_time = 0.0
+
+    for _ in range(games):
+        game.new()
+        for _ in range(moves):
+            game.draw()
+
+            start = time.perf_counter()
+            reference = per_tile_codes(game.screen, game.tile_analyzer)
+            tile_time += time.perf_counter() - start
+
+            start = time.perf_counter()
+            codes = game.tile_analyzer.analyze_board(game.screen)
+            board_time += time.perf_counter() - start
+
+            boards += 1
+            if not np.array_equal(reference, codes):
+                mismatches += 1
+
+            if not game.game_active:
+                break
+            row, col = divmod(int(rng.integers(ROWS * COLS)), COLS)
+            if rng.random() < 0.2:
+                game.toggle_flag(col, row)
+            elif not game.dig(col, row):
+                game.end_game(False)
+
+    print("🖼️ Análisis de pantalla (µs por tablero)")
+    print(f"   analyze_tile: {tile_time / boards * 1e6:.1f} | analyze_board: {board_time / boards * 1e6:.1f}")
+    if mismatches:
+        print(f"❌ Paridad: {mismatches}/{boards} tableros distintos")
+    else:
+        print(f"✅ Paridad: {boards} tableros idénticos")
+    return mismatches == 0
+
+def bench_vector_env(steps=200, seed=0):
+    """Jugadas por segundo del entorno vectorizado según el número de tableros"""
+    from game.env import VectorMinesweeperEnv
+    from settings import ROWS, COLS
+
+    rng = np.random.default_rng(seed)
+    print("🧮 Entorno vectorizado (acciones aleatorias)")
+    print(f"{'Tableros':>9} | {'µs/paso':>9} | {'Jugadas/s':>10}")
+    print("-" * 34)
+
+    for num_envs in (1, 16, 256, 1024):
+        env = VectorMinesweeperEnv(num_envs, seed=seed)
+        env.reset()
+        actions = rng.integers(0, ROWS * COLS, size=(steps, num_envs))
+        start = time.perf_counter()
+        for step_actions in actions:
+            env.step(step_actions)
+        elapsed = (time.perf_counter() - start) / steps
+        print(f"{num_envs:>9} | {elapsed * 1e6:>9.0f} | {num_envs / elapsed:>10.0f}")
+
+def bench_dataset(saves=40, samples_per_save=250):
+    """Coste y tamaño de cada guardado al crecer el dataset: pickle completo vs fragmentos compactos"""
+    import pickle
+    import tempfile
+    from ai.dataset import ShardWriter
+    from settings import ROWS, COLS
+
+    from utils.state_encoder import codes_to_state
+
+    rng = np.random.default_rng(0)
+    codes = rng.integers(0, 11, size=(samples_per_save, ROWS, COLS), dtype=np.uint8)
+    actions = rng.integers(0, 2, size=samples_per_save, dtype=np.uint8)
+    indices = rng.integers(0, ROWS * COLS, size=samples_per_save).astype(np.uint16)
+    states = codes_to_state(codes)
+    targets = np.zeros((samples_per_save, ROWS * COLS), dtype=np.float32)
+
+    print(f"💾 Guardado incremental ({samples_per_save} muestras nuevas por guardado, ms)")
+    print(f"{'Total':>7} | {'Pickle':>8} | {'Fragmentos':>10}")
+    print("-" * 32)
+
+    with tempfile.TemporaryDirectory() as directory:
+        pickle_path = os.path.join(directory, "training_data.pkl")
+        writer = ShardWriter(os.path.join(directory, "training_data"))
+        all_states, all_targets = [], []
+
+        for save in range(1, saves + 1):
+            # Formato antiguo: se reescribe todo el historial en cada guardado
+            all_states.extend(states)
+            all_targets.extend(targets)
+            start = time.perf_counter()
+            with open(pickle_path, 'wb') as f:
+                pickle.dump({'states': all_states, 'left_targets': all_targets,
+                             'right_targets': all_targets}, f)
+            pickle_cost = time.perf_counter() - start
+
+            start = time.perf_counter()
+            writer.append(codes=codes, actions=actions, indices=indices)
+            shard_cost = time.perf_counter() - start
+
+            if save % 10 == 0:
+                print(f"{len(all_states):>7} | {pickle_cost * 1000:>8.1f} | {shard_cost * 1000:>10.1f}")
+
+        pickle_size = os.path.getsize(pickle_path)
+        shard_size = sum(entry.stat().st_size for entry in os.scandir(writer.directory))
+        print(f"   Bytes por muestra: pickle {pickle_size / len(all_states):.0f} | "
+              f"fragmentos {shard_size / writer.sample_count:.1f}")
+
+def bench_dedup(num_samples=20000, seed=0):
+    """Muestras de autojuego frente a estados únicos salvo simetrías"""
+    import tempfile
+    from ai.data_collector import DataCollector
+    from ai.dataset import ShardedDataset, dedup_dataset
+
+    with tempfile.TemporaryDirectory() as directory:
+        raw_dir = os.path.join(directory, "rule_data")
+        dedup_dir = os.path.join(directory, "dedup_data")
+        DataCollector().generate_rule_based_data(num_samples, workers=1, seed=seed, directory=raw_dir)
+
+        start = time.perf_counter()
+        samples, unique = dedup_dataset([raw_dir], dedup_dir)
+        elapsed = time.perf_counter() - start
+
+        label_count = ShardedDataset(dedup_dir).load_shard(0)['label_count']
+        print("🧬 Eliminación de estados repetidos")
+        print(f"   {samples} muestras -> {unique} estados únicos ({unique / samples:.1%}) en {elapsed * 1000:.0f} ms")
+        print(f"   Máximo de jugadas distintas en un estado: {label_count.max()}")
+
+def bench_loader(num_samples=20000, batch_size=64, seed=0):
+    """Muestras por segundo del lector de fragmentos: lotes compactos y decodificados"""
+    import tempfile
+    from ai.data_collector import DataCollector
+    from ai.dataset import ShardedDataset, MemmapLoader
+
+    with tempfile.TemporaryDirectory() as directory:
+        DataCollector().generate_rule_based_data(num_samples, workers=1, seed=seed, directory=directory)
+        loader = MemmapLoader(ShardedDataset(directory), batch_size=batch_size, seed=seed)
+
+        print(f"📦 Lector de fragmentos ({loader.sample_count} muestras, lotes de {batch_size})")
+        for name, batches in (('Compactos', loader.compact_batches), ('Decodificados', loader.epoch)):
+            start = time.perf_counter()
+            for _ in batches():
+                pass
+            print(f"   {name}: {loader.sample_count / (time.perf_counter() - start):.0f} muestras/s")
+
+# Variantes del agente de reglas: (nombre, subsets, guess)
+RULE_VARIANTS = [
+    ('una casilla', False, 'random'),
+    ('subconjuntos', True, 'random'),
+    ('probabilidad', True, 'safest'),
+]
+
+def bench_rules(games=100, seed=0):
+    """Victorias y coste por decisión del agente de reglas según cómo deduce y cómo apuesta"""
+    import random
+    from agents.rules_agent import RulesAgent
+    from game.env import MinesweeperEnv
+
+    print(f"🔧 Agente de reglas ({games} partidas por tamaño)")
+    print(f"{'Tablero':>12} | {'Variante':>12} | {'Victorias':>9} | {'µs/decisión':>11}")
+    print("-" * 54)
+
+    for rows, cols, mines in BOARD_SIZES[:3]:
+        for label, subsets, guess in RULE_VARIANTS:
+            env = MinesweeperEnv(rows, cols, mines, seed=seed)
+            agent = RulesAgent(rng=random.Random(seed), subsets=subsets, guess=guess, amount_mines=mines)
+            wins = decisions = 0
+            elapsed = 0.0
+            for _ in range(games):
+                state = env.reset()
+                done = False
+                while not done:
+                    start = time.perf_counter()
+                    action = agent.predict_action(state, env.flags_remaining)
+                    elapsed += time.perf_counter() - start
+                    decisions += 1
+                    if not action:
+                        break
+                    state, _, done, info = env.step(action)
+                wins += info['won']
+            print(f"{f'{rows}x{cols}/{mines}':>12} | {label:>12} | {wins / games:>8.0%} | "
+                  f"{elapsed / decisions * 1e6:>11.0f}")
+
+def bench_batch(games=100, seed=0):
+    """Codificaciones del tablero y jugadas por partida: una jugada por llamada vs tandas (con y sin acordes)"""
+    import random
+    from agents.rules_agent import RulesAgent
+    from game.env import MinesweeperEnv
+
+    rows, cols, mines = BOARD_SIZES[2]
+    print(f"📦 Jugadas en tanda en {rows}x{cols}/{mines} ({games} partidas)")
+    print(f"{'Modo':>14} | {'Decisiones':>10} | {'Jugadas':>8} | {'ms/partida':>10}")
+    print("-" * 52)
+
+    for label, batch, chord in (('una a una', False, False), ('tanda', True, False), ('tanda+acordes', True, True)):
+        env = MinesweeperEnv(rows, cols, mines, seed=seed)
+        agent = RulesAgent(rng=random.Random(seed), amount_mines=mines)
+        decisions = moves = 0
+        start = time.perf_counter()
+        for _ in range(games):
+            state = env.reset()
+            done = False
+            while not done:
+                if batch:
+                    actions = agent.predict_actions(state, env.flags_remaining, chord)
+                else:
+                    actions = agent.predict_actions(state, env.flags_remaining)[:1]
+                decisions += 1
+                if not actions:
+                    break
+                state, done, _, _ = env.step_batch(actions)
+            moves += env.moves
+        elapsed = (time.perf_counter() - start) / games
+        print(f"{label:>14} | {decisions / games:>10.1f} | {moves / games:>8.1f} | {elapsed * 1000:>10.1f}")
+
+def bench_frontier(games=3, seed=0):
+    """ms por decisión del agente de reglas: reconstruir la frontera vs revisar solo las casillas cambiadas"""
+    import random
+    from agents.rules_agent import RulesAgent
+    from game.env import MinesweeperEnv
+
+    print(f"🧩 Frontera incremental ({games} partidas por tamaño, ms por decisión)")
+    print(f"{'Tablero':>16} | {'Jugadas':>9} | {'Completa':>9} | {'Incremental':>11}")
+    print("-" * 56)
+
+    for rows, cols, mines in BOARD_SIZES[2:]:
+        for batch in (False, True):
+            costs = []
+            for incremental in (False, True):
+                env = MinesweeperEnv(rows, cols, mines, seed=seed)
+                agent = RulesAgent(rng=random.Random(seed), amount_mines=mines)
+                decisions = 0
+                elapsed = 0.0
+                for _ in range(games):
+                    state = env.reset()
+                    done = False
+                    changed = None
+                    while not done:
+                        start = time.perf_counter()
+                        actions = agent.predict_actions(state, env.flags_remaining,
+                                                        changed=changed if incremental else None)
+                        elapsed += time.perf_counter() - start
+                        decisions += 1
+                        if not actions:
+                            break
+                        state, done, _, changed = env.step_batch(actions if batch else actions[:1])
+                costs.append(elapsed / decisions * 1000)
+            print(f"{f'{rows}x{cols}/{mines}':>16} | {'tanda' if batch else 'una a una':>9} | "
+                  f"{costs[0]:>9.2f} | {costs[1]:>11.2f}")
+
+def bench_probability(games=50, seed=0):
+    """Coste de la probabilidad exacta en tableros expertos (16x30, 99 minas) cada vez que hay que apostar"""
+    import random
+    from agents.probability import mine_probabilities, component_cache_info, clear_component_cache
+    from agents.rules_agent import RulesAgent
+    from game.env import MinesweeperEnv
+    from utils.state_encoder import board_to_codes
+
+    rows, cols, mines = BOARD_SIZES[2]
+    env = MinesweeperEnv(rows, cols, mines, seed=seed)
+    agent = RulesAgent(rng=random.Random(seed), amount_mines=mines)
+
+    # Estados de todas las jugadas tras la primera, en orden de partida
+    positions = []
+    for _ in range(games):
+        state = env.reset()
+        done = False
+        while not done:
+            if env.engine.revealed.any():
+                positions.append((board_to_codes(env.engine), env.flags_remaining))
+            action = agent.predict_action(state, env.flags_remaining)
+            if not action:
+                break
+            state, _, done, _ = env.step(action)
+
+    print(f"🎲 Probabilidad exacta en {rows}x{cols}/{mines} ({len(positions)} posiciones de {games} partidas, ms)")
+    print(f"{'Caché':>8} | {'Media':>6} | {'p99':>6} | {'Máximo':>6} | {'Aciertos':>8}")
+    print("-" * 48)
+    for cached in (False, True):
+        clear_component_cache()
+        times = []
+        for codes, flags_remaining in positions:
+            if not cached:
+                clear_component_cache()
+            start = time.perf_counter()
+            mine_probabilities(codes, flags_remaining)
+            times.append(time.perf_counter() - start)
+        times = np.array(times) * 1000
+        info = component_cache_info()
+        hit_rate = info.hits / max(info.hits + info.misses, 1)
+        print(f"{'sí' if cached else 'no':>8} | {times.mean():>6.2f} | {np.percentile(times, 99):>6.2f} | "
+              f"{times.max():>6.2f} | {hit_rate:>8.0%}")
+
+# Módulos que cargan los puntos de entrada antes de mostrar su menú
+ENTRY_POINTS = ['train_ai', 'ai_main', 'ai.trainer', 'ai.data_collector', 'agents.rules_agent']
+
+def bench_startup(repeats=5):
+    """Tiempo de importación de cada punto de entrada en un proceso nuevo"""
+    import subprocess
+
+    root = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, SDL_VIDEODRIVER='dummy', PYGAME_HIDE_SUPPORT_PROMPT='1')
+
+    print("🚀 Arranque de los puntos de entrada (ms por importación)")
+    print(f"{'Módulo':>20} | {'Tiempo':>8} | {'pygame':>6} | {'TensorFlow':>10}")
+    print("-" * 54)
+
+    check = "import sys; print('pygame' in sys.modules, 'tensorflow' in sys.modules)"
+    for module in ENTRY_POINTS:
+        code = f"import {module}; {check}"
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            result = subprocess.run([sys.executable, "-c", code], cwd=root, env=env,
+                                    capture_output=True, text=True)
+            times.append(time.perf_counter() - start)
+
+        if result.returncode != 0:
+            error = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "?"
+            print(f"{module:>20} | ❌ {error}")
+            continue
+
+        has_pygame, has_tf = result.stdout.split()[-2:]
+        print(f"{module:>20} | {min(times) * 1000:>8.0f} | {'sí' if has_pygame == 'True' else 'no':>6} | "
+              f"{'sí' if has_tf == 'True' else 'no':>10}")
+
+BENCHMARKS = {
+    'generation': bench_generation,
+    'mines': bench_mines,
+    'encoder': bench_encoder,
+    'analyzer': bench_analyzer,
+    'startup': bench_startup,
+    'vector_env': bench_vector_env,
+    'dataset': bench_dataset,
+    'dedup': bench_dedup,
+    'loader': bench_loader,
+    'rules': bench_rules,
+    'probability': bench_probability,
+    'batch': bench_batch,
+    'frontier': bench_frontier,
+}
+
+def main():
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        if name not in BENCHMARKS:
+            print(f"❌ Benchmark desconocido: {name} (opciones: {', '.join(BENCHMARKS)})")
+            continue
+        BENCHMARKS[name]()
+        print()
+
+if __name__ == "__main__":
+    main()
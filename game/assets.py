@@ -0,0 +1,53 @@
+#assets.py
+# Caché de imágenes: cada sprite se carga y escala una sola vez, la primera
+# vez que se dibuja. Importar settings (o cualquier módulo sin interfaz) no
+# toca pygame ni el disco.
+import os
+import pygame
+from settings import TILESIZE, FACE_SIZE, DIGIT_WIDTH, DIGIT_HEIGHT
+
+# Ruta absoluta: funciona aunque el proceso no se lance desde la raíz del proyecto
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets")
+
+TILE = (TILESIZE, TILESIZE)
+FACE = (FACE_SIZE, FACE_SIZE)
+DIGIT = (DIGIT_WIDTH, DIGIT_HEIGHT)
+
+# nombre -> (archivo(s), tamaño); las listas se cargan como listas de imágenes
+ASSET_FILES = {
+    'tile_numbers': ([f"Tile{i}.png" for i in range(1, 9)], TILE),
+    'tile_empty': ("TileEmpty.png", TILE),
+    'tile_exploded': ("TileExploded.png", TILE),
+    'tile_flag': ("TileFlag.png", TILE),
+    'tile_mine': ("TileMine.png", TILE),
+    'tile_unknown': ("TileUnknown.png", TILE),
+    'tile_not_mine': ("TileNotMine.png", TILE),
+    'tile_face_smile': ("TileFaceSmile.png", FACE),
+    'tile_face_loose': ("TileFaceLoose.png", FACE),
+    'tile_face_win': ("TileFaceWin.png", FACE),
+    'tile_digits': ([f"TileTime{i}.png" for i in range(10)], DIGIT),
+    'tile_time_empty': ("TileTimeEmpty.png", DIGIT),
+    'tile_time_minus': ("TileTimeMinus.png", DIGIT),
+}
+
+class AssetCache:
+    """Acceso a las imágenes como atributos (assets.tile_flag, assets.tile_numbers...)"""
+    @staticmethod
+    def _load(filename, size):
+        return pygame.transform.scale(pygame.image.load(os.path.join(ASSETS_DIR, filename)), size)
+
+    def __getattr__(self, name):
+        if name not in ASSET_FILES:
+            raise AttributeError(name)
+
+        files, size = ASSET_FILES[name]
+        if isinstance(files, list):
+            image = [self._load(filename, size) for filename in files]
+        else:
+            image = self._load(files, size)
+
+        # Guardar como atributo normal: las siguientes lecturas no pasan por aquí
+        setattr(self, name, image)
+        return image
+
+assets = AssetCache()
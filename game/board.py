@@ -1,55 +1,14 @@
-import random
 from settings import WIDTH, HEIGHT, TOP_PANEL_HEIGHT, ROWS, COLS, AMOUNT_MINES, BGCOLOUR
-from game.sprites import Tile, tile_empty, tile_mine, tile_numbers, tile_exploded
+from game.engine import BoardEngine
+from game.sprites import Tile
 import pygame
 
 class Board:
-    def __init__(self):
+    def __init__(self, engine=None):
         self.board_surface = pygame.Surface((WIDTH, HEIGHT - TOP_PANEL_HEIGHT))
-        self.board_list = [[Tile(col, row, tile_empty, ".") for row in range(ROWS)] for col in range(COLS)]
-        self.place_mines()
-        self.place_clues()
-        self.dug = []
-
-    def place_mines(self):
-        for _ in range(AMOUNT_MINES):
-            while True:
-                x = random.randint(0, ROWS-1)
-                y = random.randint(0, COLS-1)
-
-                if self.board_list[x][y].type == ".":
-                    self.board_list[x][y].image = tile_mine
-                    self.board_list[x][y].type = "X"
-                    break
-
-    def place_clues(self):
-        for x in range(ROWS):
-            for y in range(COLS):
-                if self.board_list[x][y].type != "X":
-                    total_mines = self.check_neighbours(x, y)
-                    if total_mines > 0:
-                        self.board_list[x][y].image = tile_numbers[total_mines-1]
-                        self.board_list[x][y].type = "C"
-                    else:
-                        self.board_list[x][y].image = tile_empty
-                        self.board_list[x][y].type = "/"
-
-    @staticmethod
-    def is_inside(x, y):
-        return 0 <= x < ROWS and 0 <= y < COLS
-
-    def check_neighbours(self, x, y):
-        total_mines = 0
-        for x_offset in range(-1, 2):
-            for y_offset in range(-1, 2):
-                if x_offset == 0 and y_offset == 0:
-                    continue
-                neighbour_x = x + x_offset
-                neighbour_y = y + y_offset
-                if self.is_inside(neighbour_x, neighbour_y) and self.board_list[neighbour_x][neighbour_y].type == "X":
-                    total_mines += 1
-
-        return total_mines
+        # El estado real vive en el motor; las casillas solo lo dibujan
+        self.engine = engine if engine is not None else BoardEngine(ROWS, COLS, AMOUNT_MINES)
+        self.board_list = [[Tile(col, row, self.engine) for row in range(ROWS)] for col in range(COLS)]
 
     def draw(self, screen):
         self.board_surface.fill(BGCOLOUR)
@@ -59,27 +18,9 @@ class Board:
         screen.blit(self.board_surface, (0, TOP_PANEL_HEIGHT))
 
     def dig(self, x, y):
-        if self.board_list[x][y].flagged:
-            return True
-            
-        self.dug.append((x, y))
-        if self.board_list[x][y].type == "X":
-            self.board_list[x][y].revealed = True
-            self.board_list[x][y].image = tile_exploded
-            return False
-        elif self.board_list[x][y].type == "C":
-            self.board_list[x][y].revealed = True
-            return True
-
-        self.board_list[x][y].revealed = True
-
-        for row in range(max(0, x-1), min(ROWS-1, x+1) + 1):
-            for col in range(max(0, y-1), min(COLS-1, y+1) + 1):
-                if not self.board_list[row][col].flagged and (row, col) not in self.dug:
-                    self.dig(row, col)
-        return True
+        return self.engine.dig(y, x)
 
     def display_board(self):
         #for row in self.board_list:
         #    print(row)
-        pass
\ No newline at end of file
+        pass
@@ -0,0 +1,310 @@
+#engine.py
+# Núcleo del tablero sin pygame: minas, pistas y casillas reveladas/marcadas
+# guardadas como arrays compactos de NumPy indexados como [fila, columna].
+import numpy as np
+
+def compute_clues(mines):
+    """
+    Cuenta las minas vecinas de cada casilla sumando los 8 desplazamientos
+    de la máscara de minas con un borde de ceros.
+
+    Acepta un tablero (ROWS, COLS) o una pila de N tableros (N, ROWS, COLS).
+    Las casillas con mina quedan en 0, igual que en el tablero original.
+    """
+    mines = np.asarray(mines, dtype=bool)
+    rows, cols = mines.shape[-2:]
+    pad = [(0, 0)] * (mines.ndim - 2) + [(1, 1), (1, 1)]
+    padded = np.pad(mines.astype(np.uint8), pad)
+
+    clues = np.zeros(mines.shape, dtype=np.uint8)
+    for row_offset in range(3):
+        for col_offset in range(3):
+            if row_offset == 1 and col_offset == 1:
+                continue
+            clues += padded[..., row_offset:row_offset + rows, col_offset:col_offset + cols]
+
+    clues[mines] = 0
+    return clues
+
+def _pad(mask, value):
+    """Añade un borde de una casilla con el valor dado a una máscara 2D"""
+    padded = np.full((mask.shape[0] + 2, mask.shape[1] + 2), value, dtype=mask.dtype)
+    padded[1:-1, 1:-1] = mask
+    return padded
+
+def _padded_offsets(width):
+    """Desplazamientos a los 8 vecinos en un tablero plano con borde de una casilla"""
+    return (-width - 1, -width, -width + 1, -1, 1, width - 1, width, width + 1)
+
+def _unpad(indices, width):
+    """Pasa índices planos del tablero con borde a índices planos del tablero real"""
+    padded_rows, padded_cols = np.divmod(indices, width)
+    return (padded_rows - 1) * (width - 2) + (padded_cols - 1)
+
+def label_zero_regions(clues, mines):
+    """
+    Etiqueta cada zona conexa de casillas vacías (pista 0 sin mina).
+
+    Returns:
+        labels: array (ROWS, COLS) con la etiqueta de cada casilla vacía (0 si no lo es)
+        regions: lista donde regions[etiqueta - 1] = (vacías, zona) son índices
+            planos de las casillas vacías de la zona y de la zona completa
+            (vacías + su borde numerado), es decir, lo que revela un clic en ella
+    """
+    rows, cols = clues.shape
+    width = cols + 2
+    zero_mask = _pad((clues == 0) & ~mines, False).ravel()
+    is_zero = bytearray(zero_mask.tobytes())
+    offsets = _padded_offsets(width)
+
+    labels = [0] * len(is_zero)
+    label = 0
+    for start in np.flatnonzero(zero_mask).tolist():
+        if labels[start]:
+            continue
+        label += 1
+        labels[start] = label
+        stack = [start]
+        while stack:
+            index = stack.pop()
+            for offset in offsets:
+                neighbour = index + offset
+                if is_zero[neighbour] and not labels[neighbour]:
+                    labels[neighbour] = label
+                    stack.append(neighbour)
+    labels = np.array(labels, dtype=np.int32)
+
+    # Agrupar de una vez las vacías y sus vecinos (la zona completa) por etiqueta
+    zero_cells = np.flatnonzero(zero_mask)
+    zero_labels = labels[zero_cells]
+    order = np.argsort(zero_labels, kind='stable')
+    region_starts = np.flatnonzero(np.diff(zero_labels[order])) + 1
+    zero_groups = np.split(_unpad(zero_cells[order], width), region_starts)
+
+    cells = (zero_cells[:, None] + np.array(offsets + (0,))).ravel()
+    cell_labels = np.repeat(zero_labels, len(offsets) + 1)
+    keep = _pad(np.ones((rows, cols), dtype=bool), False).ravel()[cells]
+    keys = np.unique(cell_labels[keep].astype(np.int64) * labels.size + cells[keep])
+    key_labels, cells = np.divmod(keys, labels.size)
+    cell_groups = np.split(_unpad(cells, width), np.flatnonzero(np.diff(key_labels)) + 1)
+
+    regions = list(zip(zero_groups, cell_groups)) if label else []
+    labels = labels.reshape(rows + 2, width)[1:-1, 1:-1]
+    return labels, regions
+
+def generate_mines(rows, cols, amount_mines, rng=None, count=1, safe_cell=None):
+    """
+    Coloca las minas de `count` tableros con un único muestreo sin reemplazo
+    sobre índices planos, sin bucles de rechazo.
+
+    Args:
+        rng: numpy.random.Generator (o semilla) que decide la colocación
+        count: número de tableros a generar de una vez
+        safe_cell: (fila, columna) del primer clic; se excluyen ella y sus
+            vecinos (o solo ella si no quedan casillas suficientes)
+
+    Returns:
+        Máscaras de minas (count, rows, cols)
+    """
+    rng = np.random.default_rng(rng)
+    excluded = np.zeros((rows, cols), dtype=bool)
+    if safe_cell is not None:
+        row, col = safe_cell
+        excluded[max(0, row - 1):row + 2, max(0, col - 1):col + 2] = True
+        if excluded.size - np.count_nonzero(excluded) < amount_mines:
+            excluded[:] = False
+            excluded[row, col] = True
+    candidates = np.flatnonzero(~excluded)
+
+    if amount_mines > len(candidates):
+        raise ValueError(f"No caben {amount_mines} minas en un tablero {rows}x{cols}")
+
+    if count == 1:
+        chosen = rng.choice(candidates, size=amount_mines, replace=False)[None, :]
+    elif amount_mines == 0:
+        chosen = np.zeros((count, 0), dtype=np.intp)
+    else:
+        # Una clave aleatoria por casilla: las `amount_mines` menores son las minas
+        keys = rng.random((count, len(candidates)))
+        chosen = candidates[np.argpartition(keys, amount_mines - 1, axis=1)[:, :amount_mines]]
+
+    mines = np.zeros((count, rows * cols), dtype=bool)
+    mines[np.arange(count)[:, None], chosen] = True
+    return mines.reshape(count, rows, cols)
+
+class BoardEngine:
+    def __init__(self, rows, cols, amount_mines, seed=None, safe_first_click=False, mines=None):
+        """
+        Args:
+            seed: semilla o numpy.random.Generator propio de este tablero
+            safe_first_click: si es True las minas se colocan en el primer dig,
+                lejos de la casilla pulsada
+            mines: máscara (rows, cols) ya generada (ver BoardEngine.batch)
+        """
+        self.rows = rows
+        self.cols = cols
+        self.amount_mines = amount_mines
+        self.rng = np.random.default_rng(seed)
+
+        self.mines = np.zeros((rows, cols), dtype=bool)
+        self.clues = np.zeros((rows, cols), dtype=np.uint8)
+        self.revealed = np.zeros((rows, cols), dtype=bool)
+        self.flagged = np.zeros((rows, cols), dtype=bool)
+        self.flag_count = 0
+        self.exploded = None  # (fila, columna) de la mina pisada
+        self.last_revealed = set()  # casillas reveladas por el último dig o acorde
+
+        self.mines_placed = False
+
+        if mines is not None:
+            self.mines = np.array(mines, dtype=bool)
+            self.mines_placed = True
+            self.place_clues()
+        elif not safe_first_click:
+            self.place_mines()
+            self.place_clues()
+
+    @classmethod
+    def batch(cls, count, rows, cols, amount_mines, seed=None):
+        """Genera `count` tableros con una sola llamada de colocación de minas"""
+        seeds = np.random.SeedSequence(seed).spawn(count + 1)
+        masks = generate_mines(rows, cols, amount_mines, np.random.default_rng(seeds[0]), count=count)
+        return [cls(rows, cols, amount_mines, seed=board_seed, mines=mask)
+                for board_seed, mask in zip(seeds[1:], masks)]
+
+    def place_mines(self, safe_cell=None):
+        self.mines = generate_mines(self.rows, self.cols, self.amount_mines, self.rng, safe_cell=safe_cell)[0]
+        self.mines_placed = True
+
+    def place_clues(self):
+        self.clues = compute_clues(self.mines)
+        self.padded_clues = _pad(self.clues, 0).ravel().tolist()
+        self.zero_labels, self.zero_regions = label_zero_regions(self.clues, self.mines)
+
+    def tile_type(self, row, col):
+        """Tipo de casilla con la notación original: 'X' mina, 'C' pista, '/' vacía"""
+        if self.mines[row, col]:
+            return "X"
+        return "C" if self.clues[row, col] > 0 else "/"
+
+    @property
+    def flags_remaining(self):
+        return self.amount_mines - self.flag_count
+
+    def set_flag(self, row, col, flagged):
+        """Coloca o quita una bandera manteniendo el contador al día"""
+        if self.flagged[row, col] == flagged:
+            return
+        self.flagged[row, col] = flagged
+        self.flag_count += 1 if flagged else -1
+
+    def toggle_flag(self, row, col):
+        """Alterna la bandera de una casilla oculta; devuelve True si cambió algo"""
+        if self.revealed[row, col]:
+            return False
+        if not self.flagged[row, col] and self.flags_remaining <= 0:
+            return False
+        self.set_flag(row, col, not self.flagged[row, col])
+        return True
+
+    def reveal(self, row, col):
+        """
+        Revela una casilla y, si es vacía, toda su zona.
+
+        Returns:
+            Conjunto de casillas (fila, columna) reveladas por este clic
+        """
+        if self.flagged[row, col] or self.revealed[row, col]:
+            return set()
+
+        if not self.mines_placed:
+            self.place_mines(safe_cell=(row, col))
+            self.place_clues()
+
+        if self.mines[row, col]:
+            self.revealed[row, col] = True
+            self.exploded = (row, col)
+            return {(row, col)}
+        if self.clues[row, col] > 0:
+            self.revealed[row, col] = True
+            return {(row, col)}
+
+        # Zona vacía precalculada: se revela entera con una sola asignación.
+        # Si tiene banderas o casillas vacías ya reveladas, la expansión puede
+        # quedar cortada y se recurre al flood fill.
+        zero_cells, cells = self.zero_regions[self.zero_labels[row, col] - 1]
+        revealed = self.revealed.ravel()
+        if not self.flagged.ravel()[cells].any() and not revealed[zero_cells].any():
+            new_cells = cells[~revealed[cells]]
+            revealed[new_cells] = True
+            new_rows, new_cols = np.divmod(new_cells, self.cols)
+            return set(zip(new_rows.tolist(), new_cols.tolist()))
+
+        return self._flood_fill(row, col)
+
+    def _flood_fill(self, row, col):
+        """Revela una zona vacía con un flood fill iterativo (pila + mapa de visitadas)"""
+        # Se trabaja sobre el tablero con un borde de una casilla marcado como
+        # visitado: los vecinos son desplazamientos fijos sin comprobar límites.
+        # Las banderas bloquean la expansión igual que las casillas ya reveladas.
+        width = self.cols + 2
+        blocked = _pad(self.revealed | self.flagged, True)
+        visited = bytearray(blocked.tobytes())
+        clues = self.padded_clues
+        offsets = _padded_offsets(width)
+
+        start = (row + 1) * width + col + 1
+        visited[start] = 1
+        stack = [start]
+        new_cells = [start]
+        while stack:
+            index = stack.pop()
+            if clues[index] > 0:
+                continue
+            for offset in offsets:
+                neighbour = index + offset
+                if not visited[neighbour]:
+                    visited[neighbour] = 1
+                    new_cells.append(neighbour)
+                    stack.append(neighbour)
+
+        new_rows, new_cols = np.divmod(np.array(new_cells), width)
+        new_rows -= 1
+        new_cols -= 1
+        self.revealed[new_rows, new_cols] = True
+        return set(zip(new_rows.tolist(), new_cols.tolist()))
+
+    def dig(self, row, col):
+        """Revela una casilla; devuelve False si era una mina"""
+        self.last_revealed = self.reveal(row, col)
+        return not (self.mines[row, col] and self.revealed[row, col])
+
+    def chord(self, row, col):
+        """
+        Acorde sobre un número revelado: si tiene alrededor tantas banderas
+        como indica, revela de una vez todas sus vecinas ocultas sin bandera.
+
+        Returns:
+            False si alguna de ellas era una mina
+        """
+        self.last_revealed = set()
+        if not self.revealed[row, col] or self.mines[row, col] or self.clues[row, col] == 0:
+            return True
+
+        row_slice = slice(max(row - 1, 0), row + 2)
+        col_slice = slice(max(col - 1, 0), col + 2)
+        if np.count_nonzero(self.flagged[row_slice, col_slice]) != self.clues[row, col]:
+            return True
+
+        safe = True
+        targets = ~self.revealed[row_slice, col_slice] & ~self.flagged[row_slice, col_slice]
+        for target_row, target_col in np.argwhere(targets):
+            target_row += row_slice.start
+            target_col += col_slice.start
+            self.last_revealed |= self.reveal(target_row, target_col)
+            safe = safe and not self.mines[target_row, target_col]
+        return safe
+
+    def check_win(self):
+        """Se gana cuando todas las casillas sin mina están reveladas"""
+        return not np.any(~self.mines & ~self.revealed)
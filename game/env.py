@@ -0,0 +1,254 @@
+#env.py
+# Entornos sin pantalla para autojuego y evaluación. No importan pygame.
+import numpy as np
+from settings import ROWS, COLS, AMOUNT_MINES
+from game.engine import BoardEngine, compute_clues, generate_mines
+from utils.state_encoder import StateTracker, compute_codes, codes_to_state
+
+# Recompensas por jugada
+WIN_REWARD = 1.0
+LOSS_REWARD = -1.0
+INVALID_REWARD = -0.01   # Clic sin efecto (casilla revelada, bandera, sin banderas...)
+
+def encode_action(action_type, row, col, cols=COLS, rows=ROWS):
+    """(tipo, fila, columna) -> entero: [0, ROWS*COLS) izquierdo, [ROWS*COLS, 2*ROWS*COLS) derecho"""
+    index = row * cols + col
+    return index if action_type == 'left' else rows * cols + index
+
+def decode_action(action, cols=COLS, rows=ROWS):
+    """Inverso de encode_action"""
+    action_type = 'left' if action < rows * cols else 'right'
+    row, col = divmod(int(action) % (rows * cols), cols)
+    return action_type, row, col
+
+def _dilate(mask):
+    """Extiende cada casilla marcada a sus 8 vecinos (acepta pilas (N, ROWS, COLS))"""
+    rows, cols = mask.shape[-2:]
+    padded = np.zeros(mask.shape[:-2] + (rows + 2, cols + 2), dtype=bool)
+    padded[..., 1:-1, 1:-1] = mask
+    grown = np.zeros_like(mask)
+    for row_offset in range(3):
+        for col_offset in range(3):
+            grown |= padded[..., row_offset:row_offset + rows, col_offset:col_offset + cols]
+    return grown
+
+class MinesweeperEnv:
+    """
+    Una partida sin pantalla con interfaz tipo gym: reset(seed) / step(acción).
+
+    Las acciones son tuplas (tipo, fila, columna) como las de los agentes,
+    siempre en orden (fila, columna). Es el único camino para jugar: Game,
+    el autojuego y la evaluación pasan por aquí.
+    """
+    def __init__(self, rows=ROWS, cols=COLS, amount_mines=AMOUNT_MINES, seed=None, max_moves=None):
+        self.rows = rows
+        self.cols = cols
+        self.amount_mines = amount_mines
+        self.max_moves = max_moves
+        self.rng = np.random.default_rng(seed)
+        self.tracker = StateTracker(rows, cols)
+        self.safe_cells = rows * cols - amount_mines
+        self.engine = None
+        self.moves = 0
+
+    def reset(self, seed=None):
+        """Empieza una partida nueva y devuelve su estado inicial"""
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+        self.engine = BoardEngine(self.rows, self.cols, self.amount_mines, seed=self.rng)
+        self.tracker.reset(self.engine)
+        self.moves = 0
+        return self.state
+
+    @property
+    def state(self):
+        """Estado (ROWS, COLS, 6) de solo lectura; se actualiza en cada step"""
+        return self.tracker.view
+
+    @property
+    def flags_remaining(self):
+        return self.engine.flags_remaining
+
+    def step(self, action):
+        """
+        Aplica una acción ('left' | 'right' | 'chord', fila, columna).
+
+        Returns:
+            state, reward, done, info con 'won', 'lost' y 'changed' (casillas
+            cuyo contenido cambió con esta jugada)
+        """
+        action_type, row, col = action
+        engine = self.engine
+        won = lost = False
+        changed = set()
+
+        if action_type == 'left':
+            if not engine.flagged[row, col] and not engine.revealed[row, col]:
+                lost = not engine.dig(row, col)
+                changed = engine.last_revealed
+                won = not lost and engine.check_win()
+        elif action_type == 'right':
+            if engine.toggle_flag(row, col):
+                changed = {(row, col)}
+        elif action_type == 'chord':
+            lost = not engine.chord(row, col)
+            changed = engine.last_revealed
+            won = not lost and engine.check_win()
+
+        self.tracker.update(changed)
+        self.moves += 1
+
+        if lost:
+            reward = LOSS_REWARD
+        elif not changed:
+            reward = INVALID_REWARD
+        else:
+            reward = len(changed) / self.safe_cells if action_type != 'right' else 0.0
+            if won:
+                reward += WIN_REWARD
+
+        done = won or lost or (self.max_moves is not None and self.moves >= self.max_moves)
+        if won or lost:
+            self.tracker.set_active(False)
+        return self.state, reward, done, {'won': won, 'lost': lost, 'changed': changed}
+
+    def step_batch(self, actions):
+        """
+        Aplica seguidas las jugadas de una tanda (predict_actions) hasta que
+        la partida termine. Los clics izquierdos en casillas que ya reveló una
+        cascada anterior de la tanda se saltan.
+
+        Returns:
+            state, done, info de la última jugada con 'played' (jugadas
+            aplicadas, en orden) y changed: todas las casillas que cambió la tanda
+        """
+        state, done = self.state, False
+        info = {'won': False, 'lost': False, 'changed': set()}
+        changed, played = set(), []
+        for action in actions:
+            action_type, row, col = action
+            if action_type == 'left' and self.engine.revealed[row, col]:
+                continue
+            played.append(action)
+            state, _, done, info = self.step(action)
+            changed |= info['changed']
+            if done:
+                break
+        info['played'] = played
+        return state, done, info, changed
+
+class VectorMinesweeperEnv:
+    """
+    N partidas apiladas en arrays (N, ROWS, COLS) que avanzan juntas.
+
+    step aplica una acción por tablero con operaciones de NumPy (misma semántica
+    que Board.dig, Game.check_win y las banderas de AIGame.execute_right_click)
+    y reinicia automáticamente los tableros que terminan.
+    """
+    def __init__(self, num_envs, rows=ROWS, cols=COLS, amount_mines=AMOUNT_MINES, seed=None, max_moves=None):
+        self.num_envs = num_envs
+        self.rows = rows
+        self.cols = cols
+        self.amount_mines = amount_mines
+        self.max_moves = max_moves
+        self.rng = np.random.default_rng(seed)
+
+        shape = (num_envs, rows, cols)
+        self.mines = np.zeros(shape, dtype=bool)
+        self.clues = np.zeros(shape, dtype=np.uint8)
+        self.revealed = np.zeros(shape, dtype=bool)
+        self.flagged = np.zeros(shape, dtype=bool)
+        self.flag_count = np.zeros(num_envs, dtype=np.int32)
+        self.moves = np.zeros(num_envs, dtype=np.int32)
+        self.safe_cells = rows * cols - amount_mines
+
+    def reset(self, seed=None):
+        """Reinicia todos los tableros y devuelve los estados iniciales (N, ROWS, COLS, 6)"""
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+        self._reset_boards(np.ones(self.num_envs, dtype=bool))
+        return self.states()
+
+    def _reset_boards(self, done):
+        count = int(np.count_nonzero(done))
+        if count == 0:
+            return
+        mines = generate_mines(self.rows, self.cols, self.amount_mines, self.rng, count=count)
+        self.mines[done] = mines
+        self.clues[done] = compute_clues(mines)
+        self.revealed[done] = False
+        self.flagged[done] = False
+        self.flag_count[done] = 0
+        self.moves[done] = 0
+
+    @property
+    def flags_remaining(self):
+        return self.amount_mines - self.flag_count
+
+    def codes(self):
+        """Rejillas de códigos de casilla (N, ROWS, COLS)"""
+        return compute_codes(self.revealed, self.flagged, self.mines, self.clues)
+
+    def states(self):
+        """Estados de la IA (N, ROWS, COLS, 6); todos los tableros están en juego"""
+        return codes_to_state(self.codes(), 1.0)
+
+    def _cascade(self, frontier):
+        """Expande en todos los tableros a la vez las casillas vacías recién reveladas"""
+        zero = (self.clues == 0) & ~self.mines
+        while True:
+            spreading = frontier & zero
+            if not spreading.any():
+                break
+            grown = _dilate(spreading) & ~self.revealed & ~self.flagged
+            if not grown.any():
+                break
+            self.revealed |= grown
+            frontier = grown
+
+    def step(self, actions):
+        """
+        Aplica una acción por tablero (ver encode_action).
+
+        Returns:
+            states (N, ROWS, COLS, 6), rewards (N,), dones (N,), info con 'won'
+            y 'lost' (N,). Los tableros terminados ya vienen reiniciados en states.
+        """
+        actions = np.asarray(actions, dtype=np.int64)
+        area = self.rows * self.cols
+        boards = np.arange(self.num_envs)
+        is_left = actions < area
+        rows, cols = np.divmod(actions % area, self.cols)
+
+        revealed_at = self.revealed[boards, rows, cols]
+        flagged_at = self.flagged[boards, rows, cols]
+        revealed_before = self.revealed.sum(axis=(1, 2))
+
+        # Clic derecho: alternar bandera en casillas ocultas si quedan banderas
+        right = ~is_left & ~revealed_at & (flagged_at | (self.flag_count < self.amount_mines))
+        self.flagged[boards[right], rows[right], cols[right]] = ~flagged_at[right]
+        self.flag_count[right] += np.where(flagged_at[right], -1, 1)
+
+        # Clic izquierdo: revelar si no hay bandera
+        left = is_left & ~revealed_at & ~flagged_at
+        lost = left & self.mines[boards, rows, cols]
+        frontier = np.zeros_like(self.revealed)
+        frontier[boards[left], rows[left], cols[left]] = True
+        self.revealed |= frontier
+        self._cascade(frontier & ~self.mines)
+
+        self.moves += 1
+        newly_revealed = self.revealed.sum(axis=(1, 2)) - revealed_before
+        won = ~lost & ~np.any(~self.mines & ~self.revealed, axis=(1, 2))
+
+        rewards = np.where(lost, 0.0, newly_revealed / self.safe_cells).astype(np.float32)
+        rewards[~(left | right)] = INVALID_REWARD
+        rewards[lost] = LOSS_REWARD
+        rewards[won] += WIN_REWARD
+
+        dones = lost | won
+        if self.max_moves is not None:
+            dones |= self.moves >= self.max_moves
+
+        self._reset_boards(dones)
+        return self.states(), rewards, dones, {'won': won, 'lost': lost}
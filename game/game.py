@@ -5,7 +5,9 @@ import pygame
 from settings import WIDTH, HEIGHT, TITLE, AMOUNT_MINES, TOP_PANEL_HEIGHT, DIGIT_HEIGHT, DIGIT_WIDTH, FPS, LIGHTGREY, TILESIZE
 from utils.tile_analyzer import TileAnalyzer
 from game.board import Board
-from game.sprites import Digit, FaceButton, tile_not_mine
+from game.env import MinesweeperEnv
+from game.sprites import Digit, FaceButton
+from game.assets import assets
 
 class Game:
     def __init__(self):
@@ -14,6 +16,7 @@ class Game:
         self.clock = pygame.time.Clock()
         self.TIMER_EVENT = pygame.USEREVENT + 1
         self.tile_analyzer = TileAnalyzer()
+        self.env = MinesweeperEnv()
         self.reset_game()
         
     def reset_game(self):
@@ -22,7 +25,8 @@ class Game:
         self.flags_remaining = AMOUNT_MINES
         self.elapsed_time = -1
         self.timer_started = False
-        self.board = Board()
+        self.env.reset()
+        self.board = Board(self.env.engine)
         #self.board.display_board()
         
         # Inicializar elementos del panel superior
@@ -102,13 +106,28 @@ class Game:
         
         pygame.display.flip()
 
-    def check_win(self):
-        for row in self.board.board_list:
-            for tile in row:
-                if tile.type != "X" and not tile.revealed:
-                    return False
+    @property
+    def state(self):
+        """Estado (ROWS, COLS, 6) para la IA; vista de solo lectura que se actualiza sola"""
+        return self.env.state
+
+    def dig(self, x, y):
+        """Revela la casilla (x=columna, y=fila); devuelve False si era una mina"""
+        _, _, _, info = self.env.step(('left', y, x))
+        return not info['lost']
+
+    def toggle_flag(self, x, y):
+        """Coloca/quita una bandera si está permitido; devuelve True si cambió algo"""
+        _, _, _, info = self.env.step(('right', y, x))
+        if not info['changed']:
+            return False
+        self.flags_remaining = self.env.flags_remaining
+        self.update_flag_counter()
         return True
 
+    def check_win(self):
+        return self.board.engine.check_win()
+
     def end_game(self, won):
         self.game_active = False
         self.timer_started = False
@@ -122,13 +141,18 @@ class Game:
             print("¡Juego perdido! Estado de la cara: Perdido")
             
         # Mostrar minas y banderas incorrectas
+        changed = []
         for row in self.board.board_list:
             for tile in row:
                 if tile.type == "X" and not tile.flagged:
                     tile.revealed = True
+                    changed.append((tile.row, tile.col))
                 elif tile.flagged and tile.type != "X":
                     tile.revealed = True
-                    tile.image = tile_not_mine
+                    tile.image = assets.tile_not_mine
+                    changed.append((tile.row, tile.col))
+        self.env.tracker.update(changed)
+        self.env.tracker.set_active(False)
 
     def events(self):
         for event in pygame.event.get():
@@ -180,7 +204,7 @@ class Game:
                             self.elapsed_time = 0
                             self.update_timer()
                             
-                        if not self.board.dig(tile_x, tile_y):
+                        if not self.dig(tile_x, tile_y):
                             self.end_game(False)
                             print("¡Perdido! Estado de la cara: Triste")
                         elif self.check_win():
@@ -191,13 +215,7 @@ class Game:
                 if event.button == 3:  # Right click
                     if not self.board.board_list[tile_x][tile_y].revealed:
                         # Verificar si hay banderas disponibles O si ya hay una bandera en esta casilla (para permitir quitarla)
-                        if self.flags_remaining > 0 or self.board.board_list[tile_x][tile_y].flagged:
-                            self.board.board_list[tile_x][tile_y].flagged = not self.board.board_list[tile_x][tile_y].flagged
-                            if self.board.board_list[tile_x][tile_y].flagged:
-                                self.flags_remaining -= 1
-                            else:
-                                self.flags_remaining += 1
-                            self.update_flag_counter()
+                        if self.toggle_flag(tile_x, tile_y):
                             clicked = True
                 
                 # Segunda lectura solo si se procesó un clic válido
@@ -1,16 +1,17 @@
 #sprites.py
 import pygame
 from settings import *
+from game.assets import assets
 
 class Digit:
     def __init__(self, x, y):
         self.x, self.y = x, y
         self.images = {
-            'empty': tile_time_empty,
-            'minus': tile_time_minus
+            'empty': assets.tile_time_empty,
+            'minus': assets.tile_time_minus
         }
         for i in range(10):
-            self.images[str(i)] = tile_digits[i]
+            self.images[str(i)] = assets.tile_digits[i]
         self.image = self.images['minus']
         
     def set_digit(self, digit):
@@ -24,9 +25,9 @@ class FaceButton:
     def __init__(self, x, y):
         self.x, self.y = x, y
         self.states = {
-            'normal': tile_face_smile,
-            'win': tile_face_win,
-            'loose': tile_face_loose
+            'normal': assets.tile_face_smile,
+            'win': assets.tile_face_win,
+            'loose': assets.tile_face_loose
         }
         self.image = self.states['normal']
         self.rect = self.image.get_rect(center=(x, y))
@@ -40,23 +41,56 @@ class FaceButton:
         surface.blit(self.image, (self.rect.x, self.rect.y))
 
 class Tile:
-    def __init__(self, x, y, image, type, revealed=False, flagged=False):
+    def __init__(self, x, y, engine):
         self.x, self.y = x * TILESIZE, y * TILESIZE + TOP_PANEL_HEIGHT
-        self.image = image
-        self.type = type
-        self.revealed = revealed
-        self.flagged = flagged
+        self.col, self.row = x, y
+        self.engine = engine
+        self.image_override = None
         self.rect = pygame.Rect(self.x, self.y, TILESIZE, TILESIZE)
 
+    # Vista sobre el motor: tipo, revelado y bandera se leen de sus arrays
+    @property
+    def type(self):
+        return self.engine.tile_type(self.row, self.col)
+
+    @property
+    def revealed(self):
+        return bool(self.engine.revealed[self.row, self.col])
+
+    @revealed.setter
+    def revealed(self, value):
+        self.engine.revealed[self.row, self.col] = value
+
+    @property
+    def flagged(self):
+        return bool(self.engine.flagged[self.row, self.col])
+
+    @flagged.setter
+    def flagged(self, value):
+        self.engine.set_flag(self.row, self.col, bool(value))
+
+    @property
+    def image(self):
+        if self.image_override is not None:
+            return self.image_override
+        if self.engine.mines[self.row, self.col]:
+            return assets.tile_exploded if self.engine.exploded == (self.row, self.col) else assets.tile_mine
+        clue = self.engine.clues[self.row, self.col]
+        return assets.tile_numbers[clue - 1] if clue > 0 else assets.tile_empty
+
+    @image.setter
+    def image(self, image):
+        self.image_override = image
+
     def draw(self, board_surface):
-        if self.revealed and self.image == tile_not_mine:
-            board_surface.blit(tile_not_mine, (self.x, self.y - TOP_PANEL_HEIGHT))
+        if self.revealed and self.image == assets.tile_not_mine:
+            board_surface.blit(assets.tile_not_mine, (self.x, self.y - TOP_PANEL_HEIGHT))
         elif not self.flagged and self.revealed:
             board_surface.blit(self.image, (self.x, self.y - TOP_PANEL_HEIGHT))
         elif self.flagged and not self.revealed:
-            board_surface.blit(tile_flag, (self.x, self.y - TOP_PANEL_HEIGHT))
+            board_surface.blit(assets.tile_flag, (self.x, self.y - TOP_PANEL_HEIGHT))
         elif not self.revealed:
-            board_surface.blit(tile_unknown, (self.x, self.y - TOP_PANEL_HEIGHT))
+            board_surface.blit(assets.tile_unknown, (self.x, self.y - TOP_PANEL_HEIGHT))
 
     def __repr__(self):
         return self.type
\ No newline at end of file
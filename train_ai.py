@@ -1,4 +1,5 @@
 import os
+import shutil
 import sys
 
 def main():
@@ -15,9 +16,10 @@ def main():
     print("3. 🔄 Mixto (reglas + manual) - Recomendado")
     print("4. 📊 Evaluar modelo existente")
     print("5. 🧹 Limpiar datos y empezar de cero")
+    print("6. ⚡ En línea (reglas, generando y entrenando a la vez)")
     
     while True:
-        choice = input("\nSelecciona opción (1-5): ").strip()
+        choice = input("\nSelecciona opción (1-6): ").strip()
         
         if choice == '1':
             train_automatic()
@@ -34,8 +36,11 @@ def main():
         elif choice == '5':
             clean_data()
             continue
+        elif choice == '6':
+            train_online()
+            break
         else:
-            print("❌ Opción inválida. Usa números del 1 al 5.")
+            print("❌ Opción inválida. Usa números del 1 al 6.")
 
 def train_automatic():
     """Entrenamiento completamente automático"""
@@ -63,6 +68,28 @@ def train_automatic():
     else:
         print("❌ Error durante el entrenamiento")
 
+def train_online():
+    """Entrenamiento automático con autojuego y entrenamiento solapados"""
+    print("\n⚡ Entrenamiento en línea iniciado")
+    print("-" * 30)
+    
+    from ai.trainer import MinesweeperTrainer
+    
+    trainer = MinesweeperTrainer()
+    
+    samples = int(input("¿Cuántas muestras generar? (recomendado 10000-20000): ") or "20000")
+    epochs = int(input("¿Cuántas épocas de entrenamiento? (recomendado 25-40): ") or "30")
+    replay_ratio = float(input("¿Cuántas veces usar cada muestra? (recomendado 4): ") or "4")
+    
+    model = trainer.train_online(num_samples=samples, epochs=epochs, replay_ratio=replay_ratio)
+    
+    if model:
+        print("✅ Entrenamiento completado!")
+        if input("¿Evaluar el modelo? (y/n): ").lower() == 'y':
+            trainer.evaluate_model(test_games=10)
+    else:
+        print("❌ Error durante el entrenamiento")
+
 def train_manual():
     """Entrenamiento con datos manuales"""
     print("\n🎮 Entrenamiento manual")
@@ -82,10 +109,8 @@ def train_manual():
         trainer = MinesweeperTrainer()
         epochs = int(input("¿Cuántas épocas? (recomendado 40-60): ") or "50")
         
-        # Cargar datos en el entrenador
-        trainer.data_collector = collector
-        
-        model = trainer._train_model(epochs=epochs)
+        # La sesión ya guardó sus muestras en el dataset en disco
+        model = trainer.train_from_saved_data(epochs=epochs)
         
         if model:
             print("✅ Modelo entrenado con tus datos!")
@@ -170,13 +195,20 @@ def clean_data():
     print("\n🧹 Limpiando datos...")
     
     data_files = [
-        "data/training_data.pkl",
+        "data/training_data",      # Dataset por fragmentos (directorio)
+        "data/training_data.pkl",  # Formato antiguo
+        "data/rule_data",          # Partidas del agente de reglas
+        "data/dedup_data",         # Unión sin estados repetidos
         "models/minesweeper_model.h5"
     ]
     
     removed = 0
     for file_path in data_files:
-        if os.path.exists(file_path):
+        if os.path.isdir(file_path):
+            shutil.rmtree(file_path)
+            print(f"🗑️ Eliminado: {file_path}")
+            removed += 1
+        elif os.path.exists(file_path):
             os.remove(file_path)
             print(f"🗑️ Eliminado: {file_path}")
             removed += 1
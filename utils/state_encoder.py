@@ -0,0 +1,104 @@
+import numpy as np
+
+# Códigos de casilla: 0-8 son números revelados (0 = espacio vacío)
+CODE_HIDDEN = 9     # Sin revelar
+CODE_FLAG = 10      # Con bandera
+CODE_UNKNOWN = 11   # Revelada pero sin número (mina o bandera incorrecta al terminar)
+
+def compute_codes(revealed, flagged, mines, clues):
+    """Códigos de casilla a partir de los arrays del motor (completos o seleccionados)"""
+    codes = np.where(revealed, clues, CODE_HIDDEN).astype(np.uint8)
+    codes[flagged & ~revealed] = CODE_FLAG
+    codes[revealed & (mines | flagged)] = CODE_UNKNOWN
+    return codes
+
+def board_to_codes(engine):
+    """Lee los arrays del motor y devuelve la rejilla (ROWS, COLS) de códigos uint8"""
+    return compute_codes(engine.revealed, engine.flagged, engine.mines, engine.clues)
+
+def cell_codes(engine, rows, cols):
+    """Códigos solo de las casillas indicadas (arrays de filas y columnas)"""
+    return compute_codes(engine.revealed[rows, cols], engine.flagged[rows, cols],
+                         engine.mines[rows, cols], engine.clues[rows, cols])
+
+def tile_features(codes):
+    """Canales 0-4 del estado (todo menos juego activo) para cada código"""
+    codes = np.asarray(codes)
+    features = np.zeros(codes.shape + (5,), dtype=np.float32)
+
+    is_number = (codes >= 1) & (codes <= 8)
+    features[..., 0] = codes == CODE_HIDDEN
+    features[..., 1] = codes == CODE_FLAG
+    features[..., 2] = is_number
+    features[..., 3] = codes == 0
+    features[..., 4] = np.where(is_number, codes / 8.0, 0.0)  # Normalizar 1-8 -> 0.125-1.0
+    return features
+
+def codes_to_state(codes, game_active=True):
+    """
+    Convierte códigos de casilla al tensor de 6 canales de la IA.
+
+    Acepta una rejilla (ROWS, COLS) o un lote (N, ROWS, COLS); en ese caso
+    game_active puede ser un escalar o un array (N,).
+    Produce exactamente los mismos valores que board_to_state leyendo píxeles.
+    """
+    codes = np.asarray(codes)
+    state = np.zeros(codes.shape + (6,), dtype=np.float32)
+    state[..., :5] = tile_features(codes)
+
+    active = np.asarray(game_active, dtype=np.float32)
+    state[..., 5] = active.reshape(active.shape + (1, 1))
+    return state
+
+def state_to_codes(state):
+    """Inverso de codes_to_state: estado(s) (..., 6) -> códigos de casilla uint8"""
+    state = np.asarray(state)
+    codes = np.full(state.shape[:-1], CODE_UNKNOWN, dtype=np.uint8)
+    codes[state[..., 3] > 0] = 0
+    is_number = state[..., 2] > 0
+    codes[is_number] = np.rint(state[..., 4][is_number] * 8).astype(np.uint8)
+    codes[state[..., 1] > 0] = CODE_FLAG
+    codes[state[..., 0] > 0] = CODE_HIDDEN
+    return codes
+
+def engine_to_state(engine, game_active=True):
+    """Equivalente a board_to_state sin pasar por la pantalla"""
+    return codes_to_state(board_to_codes(engine), game_active)
+
+class StateTracker:
+    """
+    Tensor de estado persistente de una partida.
+
+    Se reescribe entero solo al empezar cada partida; después cada jugada
+    parchea únicamente las casillas que cambió. El canal 5 (juego activo)
+    se guarda también como escalar y solo se rellena cuando cambia: al
+    terminar la partida y al empezar la siguiente. Se escribe en el momento,
+    y no al leer la vista, para que las vistas ya entregadas lo vean; son
+    ROWS*COLS valores dos veces por partida, nada frente a las jugadas.
+    """
+    def __init__(self, rows, cols):
+        self.engine = None
+        self.game_active = True
+        self.state = np.zeros((rows, cols, 6), dtype=np.float32)
+        self.state[..., 5] = 1.0
+        # Vista de solo lectura que se entrega a los agentes
+        self.view = self.state.view()
+        self.view.flags.writeable = False
+
+    def reset(self, engine, game_active=True):
+        """Empieza a seguir un tablero nuevo"""
+        self.engine = engine
+        self.state[..., :5] = tile_features(board_to_codes(engine))
+        self.set_active(game_active)
+
+    def update(self, cells):
+        """Actualiza solo las casillas (fila, columna) indicadas"""
+        if not cells:
+            return
+        rows, cols = (np.array(axis) for axis in zip(*cells))
+        self.state[rows, cols, :5] = tile_features(cell_codes(self.engine, rows, cols))
+
+    def set_active(self, game_active):
+        if bool(game_active) != self.game_active:
+            self.game_active = bool(game_active)
+            self.state[..., 5] = float(self.game_active)
@@ -1,4 +1,24 @@
+import numpy as np
+import pygame
 from settings import *
+from utils.state_encoder import CODE_HIDDEN, CODE_FLAG, CODE_UNKNOWN
+
+# Paleta precalculada para analyze_board (mismos colores y orden que analyze_tile)
+HIDDEN_CORNER = np.array([0xFF, 0xFF, 0xFF], dtype=np.int16)
+REVEALED_CORNER = np.array([0x80, 0x80, 0x80], dtype=np.int16)
+FLAG_CENTER = np.array([0x00, 0x00, 0x00], dtype=np.int16)
+NUMBER_PALETTE = np.array([
+    [0x00, 0x00, 0xFF],  # 1
+    [0x00, 0x80, 0x00],  # 2
+    [0xFF, 0x00, 0x00],  # 3
+    [0x00, 0x00, 0x80],  # 4
+    [0x80, 0x00, 0x00],  # 5
+    [0x00, 0x80, 0x80],  # 6
+    [0x00, 0x00, 0x00],  # 7
+    [0x80, 0x80, 0x80],  # 8
+    [0xC0, 0xC0, 0xC0],  # Espacio vacío
+], dtype=np.int16)
+NUMBER_CODES = np.array([1, 2, 3, 4, 5, 6, 7, 8, 0], dtype=np.uint8)
 
 class TileAnalyzer:
     @staticmethod
@@ -116,3 +136,53 @@ class TileAnalyzer:
                 return "Espacio vacío", detected_colors, {'pixels_00_01': '808080', 'centro': 'C0C0C0'}
         
         return "Desconocido", detected_colors, {}
+
+    @staticmethod
+    def _color_match(pixels, colors, tolerance=10):
+        """Compara píxeles (..., 3) con una o varias referencias (3,) / (P, 3)"""
+        pixels = pixels.astype(np.int16)
+        if colors.ndim == 1:
+            return np.all(np.abs(pixels - colors) <= tolerance, axis=-1)
+        return np.all(np.abs(pixels[..., None, :] - colors) <= tolerance, axis=-1)
+
+    @staticmethod
+    def analyze_board(screen, rows=ROWS, cols=COLS):
+        """
+        Analiza todas las casillas de una vez y devuelve una rejilla (ROWS, COLS)
+        de códigos enteros (0-8 números, CODE_HIDDEN, CODE_FLAG, CODE_UNKNOWN).
+
+        Lee la pantalla como un array sin copiarla (surfarray.pixels3d) y toma
+        los píxeles de muestra de todas las casillas con indexado avanzado.
+        """
+        tile_x = np.arange(cols) * TILESIZE
+        tile_y = np.arange(rows) * TILESIZE + TOP_PANEL_HEIGHT
+        width, height = screen.get_size()
+
+        # Casillas cuyas muestras caen fuera de la pantalla
+        inside = (tile_y[:, None] + 8 < height) & (tile_x[None, :] + 8 < width)
+        xs = np.minimum(tile_x, width - 9)[None, :]
+        ys = np.minimum(tile_y, height - 9)[:, None]
+
+        pixels = pygame.surfarray.pixels3d(screen)  # (ancho, alto, 3), indexado [x, y]
+        try:
+            pixel_00 = pixels[xs, ys]
+            pixel_01 = pixels[xs, ys + 1]
+            center_pixel2 = pixels[xs + 8, ys + 8]
+        finally:
+            del pixels  # Libera el bloqueo de la superficie
+
+        match = TileAnalyzer._color_match
+        hidden = match(pixel_00, HIDDEN_CORNER) & match(pixel_01, HIDDEN_CORNER)
+        revealed = ~hidden & match(pixel_00, REVEALED_CORNER) & match(pixel_01, REVEALED_CORNER)
+
+        codes = np.full((rows, cols), CODE_UNKNOWN, dtype=np.uint8)
+        codes[hidden] = CODE_HIDDEN
+        codes[hidden & match(center_pixel2, FLAG_CENTER)] = CODE_FLAG
+
+        # Primer color de la paleta que coincide, como la cadena de elif de analyze_tile
+        number_match = match(center_pixel2, NUMBER_PALETTE)
+        has_number = revealed & number_match.any(axis=-1)
+        codes[has_number] = NUMBER_CODES[np.argmax(number_match, axis=-1)][has_number]
+
+        codes[~inside] = CODE_UNKNOWN
+        return codes